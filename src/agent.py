@@ -7,11 +7,14 @@ The most advanced AI Agent with complete Airtable API knowledge and perfect MCP
 import asyncio
 import json
 import logging
+import logging.handlers
 import os
+import queue
 import sys
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Union
-from dataclasses import dataclass
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple, Union
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 
 import aiohttp
@@ -24,8 +27,18 @@ from rich.table import Table
 
 # Import our custom modules
 from .context_manager import ContextManager, DocumentChunk
-from .mcp_client import MCPClient, MCPError
-from .airtable_expert import AirtableExpert, AirtableOperation
+from .mcp_client import MCPClient, MCPError, WRITE_TOOLS
+from .airtable_expert import AirtableExpert, AirtableOperation, group_operation_waves
+from .query_cache import SemanticQueryCache
+
+
+_UTC = timezone.utc
+
+# libyaml's C loader is several times faster when available
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Listener thread feeding the shared agent logger; one at a time across agents
+_LOG_LISTENER: Optional[logging.handlers.QueueListener] = None
 
 
 @dataclass
@@ -34,10 +47,32 @@ class AgentConfig:
     name: str = "Airtable AI Agent"
     version: str = "1.0.0"
     max_context_tokens: int = 128000  # Claude 3.5 Sonnet context window
+    embedding_backend: str = "torch"  # "onnx" / "openvino" need sentence-transformers>=3.2
+    embedding_file: Optional[str] = None  # e.g. "onnx/model_qint8_avx512_vnni.onnx"
     mcp_server_url: str = "http://localhost:8010/mcp"
     log_level: str = "INFO"
     enable_metrics: bool = True
     cache_duration: int = 300  # 5 minutes
+    query_cache_size: int = 1024
+    semantic_cache_threshold: float = 0.9  # Cosine similarity for a cache hit
+    http_pool_size: int = 100
+    http_pool_size_per_host: int = 32
+    http_timeout: int = 30
+    health_check_ttl: float = 5.0  # Seconds to reuse component health results
+
+
+@dataclass(slots=True)
+class AgentMetrics:
+    """Performance counters for the AI Agent"""
+    requests_handled: int = 0
+    mcp_calls_made: int = 0
+    context_optimizations: int = 0
+    errors_handled: int = 0
+    start_time: datetime = field(default_factory=lambda: datetime.now(_UTC))
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """Snapshot of the counters for reporting"""
+        return asdict(self)
 
 
 class AirtableAIAgent:
@@ -52,47 +87,74 @@ class AirtableAIAgent:
     - Performance optimization and monitoring
     """
     
-    def __init__(self, config_path: Optional[str] = None):
+    def __init__(self, config_path: Optional[str] = None, config: Optional[AgentConfig] = None):
         """Initialize the AI Agent"""
         self.console = Console()
-        self.config = self._load_config(config_path)
+        self.config = config or self._load_config(config_path)
         self.logger = self._setup_logging()
         
         # Initialize core components
         self.context_manager = ContextManager(
-            max_tokens=self.config.max_context_tokens
+            max_tokens=self.config.max_context_tokens,
+            embedding_backend=self.config.embedding_backend,
+            embedding_file=self.config.embedding_file
         )
         self.mcp_client = MCPClient(self.config.mcp_server_url)
         self.airtable_expert = AirtableExpert()
         
+        # Bound in-flight MCP calls to the per-host connection limit
+        self._mcp_semaphore = asyncio.Semaphore(self.config.http_pool_size_per_host)
+        
+        # Shared HTTP session, opened in initialize() and closed in shutdown()
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        # Cache of responses for repeated / near-duplicate queries
+        self.query_cache = SemanticQueryCache(
+            max_size=self.config.query_cache_size,
+            ttl=self.config.cache_duration,
+            threshold=self.config.semantic_cache_threshold
+        )
+        self.mcp_client.add_write_listener(self._on_mcp_write)
+        
+        # Memoized capabilities and health results
+        self._capabilities_static: Optional[Dict[str, Any]] = None
+        self._tools_cache: Optional[Tuple[float, List[Any]]] = None
+        self._health_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        
         # Performance tracking
-        self.metrics = {
-            'requests_handled': 0,
-            'mcp_calls_made': 0,
-            'context_optimizations': 0,
-            'errors_handled': 0,
-            'start_time': datetime.now(timezone.utc)
-        }
+        self.metrics = AgentMetrics()
+        self._started = time.perf_counter()  # Monotonic anchor for uptime
         
         self.logger.info(f"🤖 {self.config.name} v{self.config.version} initialized")
     
-    def _load_config(self, config_path: Optional[str]) -> AgentConfig:
+    @classmethod
+    async def create(cls, config_path: Optional[str] = None) -> "AirtableAIAgent":
+        """Build an agent from inside a running event loop without blocking it on file I/O"""
+        config = await asyncio.to_thread(cls._load_config, config_path)
+        return cls(config=config)
+    
+    @staticmethod
+    def _load_config(config_path: Optional[str]) -> AgentConfig:
         """Load agent configuration"""
         if config_path and Path(config_path).exists():
             with open(config_path, 'r') as f:
-                config_data = yaml.safe_load(f)
+                config_data = yaml.load(f, Loader=_YAML_LOADER)
             return AgentConfig(**config_data)
         return AgentConfig()
     
     def _setup_logging(self) -> logging.Logger:
-        """Setup rich logging"""
+        """Setup rich logging, rendered on a background thread"""
+        global _LOG_LISTENER
         logger = logging.getLogger("airtable_ai_agent")
         logger.setLevel(getattr(logging, self.config.log_level))
         
-        # Remove existing handlers
+        # Remove existing handlers, stopping the listener fed by a previous agent
+        if _LOG_LISTENER is not None:
+            _LOG_LISTENER.stop()
+            _LOG_LISTENER = None
         logger.handlers = []
         
-        # Add rich handler
+        # Rich handler does the (relatively slow) rendering
         handler = RichHandler(
             console=self.console,
             show_time=True,
@@ -103,10 +165,28 @@ class AirtableAIAgent:
             "%(message)s",
             datefmt="[%X]"
         ))
-        logger.addHandler(handler)
+        
+        # The event loop only enqueues records; a listener thread emits them
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        self._log_listener = _LOG_LISTENER = logging.handlers.QueueListener(
+            log_queue, handler, respect_handler_level=True
+        )
+        self._log_listener.start()
         
         return logger
     
+    @staticmethod
+    def _cache_scope(analysis: Any) -> Tuple:
+        """Entities a query refers to, as a hashable key for semantic cache hits"""
+        entities = getattr(analysis, 'entities', None) or {}
+        return tuple(sorted((kind, tuple(values)) for kind, values in entities.items()))
+    
+    def _on_mcp_write(self, tool_name: str) -> None:
+        """Purge cached responses once Airtable data or schema changes"""
+        self.query_cache.invalidate()
+        self.logger.debug("Query cache invalidated after %s", tool_name)
+    
     async def initialize(self) -> None:
         """Initialize all agent components"""
         self.console.print(Panel.fit(
@@ -114,6 +194,19 @@ class AirtableAIAgent:
             style="bold blue"
         ))
         
+        # One keep-alive session for every MCP call the agent makes
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.config.http_pool_size,
+                    limit_per_host=self.config.http_pool_size_per_host,
+                    keepalive_timeout=60,
+                    ttl_dns_cache=300
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.config.http_timeout)
+            )
+            self.mcp_client.use_session(self._session)
+        
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
@@ -134,62 +227,70 @@ class AirtableAIAgent:
             await self.airtable_expert.initialize()
             progress.update(init_task, description="✅ Airtable expert ready")
         
+        self._get_static_capabilities()
         self.logger.info("🎯 Agent initialization complete")
     
-    async def process_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def process_query(
+        self,
+        query: str,
+        context: Optional[Dict[str, Any]] = None,
+        query_embedding: Optional[Any] = None
+    ) -> Dict[str, Any]:
         """
         Process a user query about Airtable operations.
         
         Args:
             query: Natural language query from user
             context: Optional context from previous interactions
+            query_embedding: Optional precomputed embedding of the query
             
         Returns:
             Response containing answer, actions taken, and metadata
         """
-        self.metrics['requests_handled'] += 1
-        start_time = datetime.now()
+        self.metrics.requests_handled += 1
+        start_ns = time.perf_counter_ns()
         
         try:
-            self.logger.info(f"📝 Processing query: {query[:100]}...")
+            self.logger.info("📝 Processing query: %s...", query[:100])
             
             # Analyze query to determine intent and required context
             analysis = await self.airtable_expert.analyze_query(query)
-            self.logger.debug(f"Query analysis: {analysis}")
+            self.logger.debug("Query analysis: %s", analysis)
+            
+            # Serve repeated and near-duplicate queries from the cache; similar
+            # queries only match when they name the same tables, records and fields.
+            # Answers to follow-ups depend on their context, so those aren't cached.
+            if query_embedding is None:
+                query_embedding = await self.context_manager.embed(query)
+            cache_vector = await self.context_manager.reduce_embedding(query_embedding)
+            cache_scope = self._cache_scope(analysis)
+            cached_response = None
+            if context is None:
+                cached_response = self.query_cache.get(query, cache_vector, cache_scope)
+            if cached_response is not None:
+                cached_response['metadata'] = {
+                    **cached_response.get('metadata', {}),
+                    'processing_time': (time.perf_counter_ns() - start_ns) / 1e9,
+                    'cache_hit': True,
+                    'timestamp': datetime.now(_UTC).isoformat()
+                }
+                self.logger.info("⚡ Query served from cache")
+                return cached_response
             
             # Prepare optimal context for the query
             context_chunks = await self.context_manager.get_relevant_context(
                 query=query,
                 analysis=analysis,
-                previous_context=context
+                previous_context=context,
+                query_embedding=query_embedding
             )
             
             # Determine required MCP operations
             operations = await self.airtable_expert.plan_operations(query, analysis)
-            self.logger.debug(f"Planned operations: {len(operations)}")
+            self.logger.debug("Planned operations: %d", len(operations))
             
             # Execute MCP operations
-            mcp_results = []
-            for operation in operations:
-                try:
-                    result = await self.mcp_client.execute_tool(
-                        operation.tool_name,
-                        operation.parameters
-                    )
-                    mcp_results.append({
-                        'operation': operation.tool_name,
-                        'success': True,
-                        'result': result
-                    })
-                    self.metrics['mcp_calls_made'] += 1
-                except MCPError as e:
-                    self.logger.error(f"MCP operation failed: {e}")
-                    mcp_results.append({
-                        'operation': operation.tool_name,
-                        'success': False,
-                        'error': str(e)
-                    })
-                    self.metrics['errors_handled'] += 1
+            mcp_results = await self._execute_operations(operations)
             
             # Generate comprehensive response
             response = await self.airtable_expert.generate_response(
@@ -202,46 +303,115 @@ class AirtableAIAgent:
             # Add metadata
             response.update({
                 'metadata': {
-                    'processing_time': (datetime.now() - start_time).total_seconds(),
+                    'processing_time': (time.perf_counter_ns() - start_ns) / 1e9,
                     'context_chunks_used': len(context_chunks),
                     'mcp_operations_executed': len(operations),
-                    'timestamp': datetime.now(timezone.utc).isoformat()
+                    'cache_hit': False,
+                    'timestamp': datetime.now(_UTC).isoformat()
                 }
             })
             
-            self.logger.info(f"✅ Query processed successfully in {response['metadata']['processing_time']:.2f}s")
+            # Only cache successful, read-only results. Answers built from MCP
+            # data are only reused for the exact same query text.
+            if context is None and response.get('success') and not any(
+                operation.tool_name in WRITE_TOOLS for operation in operations
+            ):
+                self.query_cache.put(
+                    query, response, None if operations else cache_vector, cache_scope
+                )
+            
+            self.logger.info("✅ Query processed successfully in %.2fs", response['metadata']['processing_time'])
             return response
             
         except Exception as e:
-            self.logger.error(f"❌ Error processing query: {e}")
-            self.metrics['errors_handled'] += 1
+            self.logger.error("❌ Error processing query: %s", e)
+            self.metrics.errors_handled += 1
             
             return {
                 'success': False,
                 'error': str(e),
                 'suggestions': await self.airtable_expert.get_error_suggestions(str(e)),
                 'metadata': {
-                    'processing_time': (datetime.now() - start_time).total_seconds(),
-                    'timestamp': datetime.now(timezone.utc).isoformat()
+                    'processing_time': (time.perf_counter_ns() - start_ns) / 1e9,
+                    'timestamp': datetime.now(_UTC).isoformat()
                 }
             }
     
-    async def batch_process(self, queries: List[str]) -> List[Dict[str, Any]]:
-        """Process multiple queries efficiently with shared context"""
+    async def _execute_operations(self, operations: List[AirtableOperation]) -> List[Dict[str, Any]]:
+        """Execute planned MCP operations concurrently, wave by wave"""
+        mcp_results: List[Optional[Dict[str, Any]]] = [None] * len(operations)
+        
+        for wave in group_operation_waves(operations):
+            outcomes = await asyncio.gather(
+                *(self._execute_operation(operations[i]) for i in wave),
+                return_exceptions=True
+            )
+            
+            for index, outcome in zip(wave, outcomes):
+                operation = operations[index]
+                if isinstance(outcome, MCPError):
+                    self.logger.error("MCP operation failed: %s", outcome)
+                    mcp_results[index] = {
+                        'operation': operation.tool_name,
+                        'success': False,
+                        'error': str(outcome)
+                    }
+                    self.metrics.errors_handled += 1
+                elif isinstance(outcome, BaseException):
+                    raise outcome
+                else:
+                    mcp_results[index] = {
+                        'operation': operation.tool_name,
+                        'success': True,
+                        'result': outcome
+                    }
+                    self.metrics.mcp_calls_made += 1
+        
+        return mcp_results
+    
+    async def _execute_operation(self, operation: AirtableOperation) -> Dict[str, Any]:
+        """Execute one MCP operation, bounded by the connection pool size"""
+        async with self._mcp_semaphore:
+            return await self.mcp_client.execute_tool(
+                operation.tool_name,
+                operation.parameters
+            )
+    
+    async def batch_process(
+        self,
+        queries: List[str],
+        max_concurrency: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Process multiple independent queries concurrently"""
         self.logger.info(f"📦 Processing batch of {len(queries)} queries")
         
-        # Process queries concurrently where possible
-        tasks = []
-        shared_context = {}
+        # Embed every query in one model call instead of one call per query;
+        # if that fails, each query embeds itself (and reports its own error)
+        try:
+            embeddings = await self.context_manager.embed_batch(queries)
+        except Exception as e:
+            self.logger.warning("Batch embedding failed, embedding per query: %s", e)
+            embeddings = [None] * len(queries)
         
-        for i, query in enumerate(queries):
-            # Use context from previous queries in batch
-            context = shared_context if i > 0 else None
-            task = self.process_query(query, context)
-            tasks.append(task)
+        # Start the longest queries first so they don't straggle at the end
+        order = sorted(range(len(queries)), key=lambda i: -len(queries[i]))
+        limiter = asyncio.Semaphore(max_concurrency) if max_concurrency else None
         
-        # Execute all tasks
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        async def run(i: int) -> Dict[str, Any]:
+            if limiter is None:
+                return await self.process_query(queries[i], query_embedding=embeddings[i])
+            async with limiter:
+                return await self.process_query(queries[i], query_embedding=embeddings[i])
+        
+        ordered_results = await asyncio.gather(
+            *(run(i) for i in order),
+            return_exceptions=True
+        )
+        
+        # Restore the caller's query order
+        results: List[Any] = [None] * len(queries)
+        for position, i in enumerate(order):
+            results[i] = ordered_results[position]
         
         # Handle any exceptions
         processed_results = []
@@ -258,46 +428,93 @@ class AirtableAIAgent:
         self.logger.info(f"✅ Batch processing complete: {len(processed_results)} results")
         return processed_results
     
+    def _get_static_capabilities(self) -> Dict[str, Any]:
+        """Build (once) the parts of the capabilities payload that never change"""
+        if self._capabilities_static is None:
+            self._capabilities_static = {
+                'agent_info': {
+                    'name': self.config.name,
+                    'version': self.config.version,
+                    'status': 'active'
+                },
+                'airtable_knowledge': {
+                    'api_coverage': '100%',
+                    'supported_operations': 'All Airtable Web API endpoints'
+                },
+                'mcp_integration': {
+                    'server_url': self.config.mcp_server_url,
+                    'tool_categories': [
+                        'Data Operations',
+                        'Webhook Management', 
+                        'Schema Discovery',
+                        'Table Management',
+                        'Field Management',
+                        'Batch Operations',
+                        'Attachment Management',
+                        'Advanced Views',
+                        'Base Management'
+                    ]
+                },
+                'context_management': {
+                    'max_tokens': self.config.max_context_tokens,
+                    'optimization_enabled': True,
+                    'caching_enabled': True
+                }
+            }
+        return self._capabilities_static
+    
+    async def _get_mcp_tools(self) -> List[Any]:
+        """List MCP tools, reusing the last result for cache_duration seconds"""
+        now = time.monotonic()
+        if self._tools_cache is not None and now - self._tools_cache[0] < self.config.cache_duration:
+            return self._tools_cache[1]
+        
+        mcp_tools = await self.mcp_client.list_available_tools()
+        self._tools_cache = (now, mcp_tools)
+        return mcp_tools
+    
     async def get_capabilities(self) -> Dict[str, Any]:
         """Get comprehensive information about agent capabilities"""
-        mcp_tools = await self.mcp_client.list_available_tools()
+        static = self._get_static_capabilities()
+        mcp_tools = await self._get_mcp_tools()
         
         return {
-            'agent_info': {
-                'name': self.config.name,
-                'version': self.config.version,
-                'status': 'active'
-            },
+            **static,
             'airtable_knowledge': {
                 'documentation_chunks': await self.context_manager.get_stats(),
-                'api_coverage': '100%',
-                'supported_operations': 'All Airtable Web API endpoints'
+                **static['airtable_knowledge']
             },
             'mcp_integration': {
-                'server_url': self.config.mcp_server_url,
-                'available_tools': len(mcp_tools),
-                'tool_categories': [
-                    'Data Operations',
-                    'Webhook Management', 
-                    'Schema Discovery',
-                    'Table Management',
-                    'Field Management',
-                    'Batch Operations',
-                    'Attachment Management',
-                    'Advanced Views',
-                    'Base Management'
-                ]
+                **static['mcp_integration'],
+                'available_tools': len(mcp_tools)
             },
-            'performance_metrics': self.metrics,
-            'context_management': {
-                'max_tokens': self.config.max_context_tokens,
-                'optimization_enabled': True,
-                'caching_enabled': True
-            }
+            'performance_metrics': self.metrics.as_dict()
         }
     
     async def health_check(self) -> Dict[str, Any]:
         """Perform comprehensive health check"""
+        checks = await self._run_health_checks()
+        
+        # Overall health
+        all_healthy = all(
+            check.get('status') == 'healthy' 
+            for check in checks.values()
+        )
+        
+        return {
+            'overall_status': 'healthy' if all_healthy else 'degraded',
+            'timestamp': datetime.now(_UTC).isoformat(),
+            'checks': dict(checks),
+            'uptime': time.perf_counter() - self._started,
+            'metrics': self.metrics.as_dict()
+        }
+    
+    async def _run_health_checks(self) -> Dict[str, Any]:
+        """Check components, reusing recent results so rapid polling stays cheap"""
+        now = time.monotonic()
+        if self._health_cache is not None and now - self._health_cache[0] < self.config.health_check_ttl:
+            return self._health_cache[1]
+        
         checks = {}
         
         try:
@@ -312,19 +529,8 @@ class AirtableAIAgent:
         except Exception as e:
             checks['context_manager'] = {'status': 'error', 'error': str(e)}
         
-        # Overall health
-        all_healthy = all(
-            check.get('status') == 'healthy' 
-            for check in checks.values()
-        )
-        
-        return {
-            'overall_status': 'healthy' if all_healthy else 'degraded',
-            'timestamp': datetime.now(timezone.utc).isoformat(),
-            'checks': checks,
-            'uptime': (datetime.now(timezone.utc) - self.metrics['start_time']).total_seconds(),
-            'metrics': self.metrics
-        }
+        self._health_cache = (now, checks)
+        return checks
     
     def display_status(self) -> None:
         """Display current agent status in rich format"""
@@ -333,14 +539,14 @@ class AirtableAIAgent:
         table.add_column("Metric", style="cyan")
         table.add_column("Value", style="green")
         
-        uptime = datetime.now(timezone.utc) - self.metrics['start_time']
+        uptime = timedelta(seconds=time.perf_counter() - self._started)
         
         table.add_row("Status", "🟢 Active")
         table.add_row("Uptime", str(uptime))
-        table.add_row("Requests Handled", str(self.metrics['requests_handled']))
-        table.add_row("MCP Calls Made", str(self.metrics['mcp_calls_made']))
-        table.add_row("Context Optimizations", str(self.metrics['context_optimizations']))
-        table.add_row("Errors Handled", str(self.metrics['errors_handled']))
+        table.add_row("Requests Handled", str(self.metrics.requests_handled))
+        table.add_row("MCP Calls Made", str(self.metrics.mcp_calls_made))
+        table.add_row("Context Optimizations", str(self.metrics.context_optimizations))
+        table.add_row("Errors Handled", str(self.metrics.errors_handled))
         
         self.console.print(table)
     
@@ -351,7 +557,25 @@ class AirtableAIAgent:
         await self.mcp_client.close()
         await self.context_manager.cleanup()
         
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            # Give the connector time to close underlying transports
+            await asyncio.sleep(0.25)
+        self._session = None
+        
         self.logger.info("✅ Agent shutdown complete")
+        
+        # Flush queued log records, then log directly so later records aren't stranded
+        global _LOG_LISTENER
+        if self._log_listener is not None and self._log_listener is _LOG_LISTENER:
+            self._log_listener.stop()
+            _LOG_LISTENER = None
+            self.logger.handlers = list(self._log_listener.handlers)
+        self._log_listener = None
+
+
+# REPL commands that end the interactive session
+_EXIT_COMMANDS = frozenset({'quit', 'exit', 'q'})
 
 
 async def main():
@@ -371,9 +595,11 @@ async def main():
             try:
                 query = agent.console.input("\n[bold cyan]Ask me anything about Airtable:[/bold cyan] ")
                 
-                if query.lower() in ['quit', 'exit', 'q']:
+                command = query.strip().lower()
+                
+                if command in _EXIT_COMMANDS:
                     break
-                elif query.lower() == 'help':
+                elif command == 'help':
                     agent.console.print(Panel(
                         "Available commands:\n"
                         "• Ask any Airtable-related question\n"
@@ -384,14 +610,14 @@ async def main():
                         title="Help"
                     ))
                     continue
-                elif query.lower() == 'status':
+                elif command == 'status':
                     agent.display_status()
                     continue
-                elif query.lower() == 'capabilities':
+                elif command == 'capabilities':
                     caps = await agent.get_capabilities()
                     agent.console.print_json(data=caps)
                     continue
-                elif query.lower() == 'health':
+                elif command == 'health':
                     health = await agent.health_check()
                     agent.console.print_json(data=health)
                     continue
@@ -425,4 +651,11 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    try:
+        # libuv-based loop: higher throughput for the aiohttp-heavy MCP path
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    
+    asyncio.run(main())
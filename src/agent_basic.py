@@ -9,9 +9,10 @@ import json
 import logging
 import os
 import sys
-from datetime import datetime, timezone
+import time
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, field, is_dataclass
 from pathlib import Path
 
 # Basic logging setup
@@ -23,7 +24,11 @@ logging.basicConfig(
 # Import our basic modules
 from .context_manager_basic import ContextManagerBasic, DocumentChunk
 from .mcp_client import MCPClient, MCPError
-from .airtable_expert import AirtableExpert, AirtableOperation
+from .airtable_expert import AirtableExpert, AirtableOperation, group_operation_waves
+from .json_utils import dumps
+
+
+_UTC = timezone.utc
 
 
 @dataclass
@@ -36,6 +41,21 @@ class AgentConfig:
     log_level: str = "INFO"
     enable_metrics: bool = True
     cache_duration: int = 300
+    http_pool_size_per_host: int = 32  # Max concurrent MCP calls
+
+
+@dataclass(slots=True)
+class AgentMetrics:
+    """Performance counters for the AI Agent"""
+    requests_handled: int = 0
+    mcp_calls_made: int = 0
+    context_optimizations: int = 0
+    errors_handled: int = 0
+    start_time: datetime = field(default_factory=lambda: datetime.now(_UTC))
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """Snapshot of the counters for reporting"""
+        return asdict(self)
 
 
 class AirtableAIAgentBasic:
@@ -43,9 +63,9 @@ class AirtableAIAgentBasic:
     Basic Airtable AI Agent for testing without ML dependencies.
     """
     
-    def __init__(self, config_path: Optional[str] = None):
+    def __init__(self, config_path: Optional[str] = None, config: Optional[AgentConfig] = None):
         """Initialize the AI Agent"""
-        self.config = self._load_config(config_path)
+        self.config = config or self._load_config(config_path)
         self.logger = self._setup_logging()
         
         # Initialize core components
@@ -55,23 +75,29 @@ class AirtableAIAgentBasic:
         self.mcp_client = MCPClient(self.config.mcp_server_url)
         self.airtable_expert = AirtableExpert()
         
+        # Bound in-flight MCP calls to the per-host connection limit
+        self._mcp_semaphore = asyncio.Semaphore(self.config.http_pool_size_per_host)
+        
         # Performance tracking
-        self.metrics = {
-            'requests_handled': 0,
-            'mcp_calls_made': 0,
-            'context_optimizations': 0,
-            'errors_handled': 0,
-            'start_time': datetime.now(timezone.utc)
-        }
+        self.metrics = AgentMetrics()
+        self._started = time.perf_counter()  # Monotonic anchor for uptime
         
         self.logger.info(f"🤖 {self.config.name} v{self.config.version} initialized")
     
-    def _load_config(self, config_path: Optional[str]) -> AgentConfig:
+    @classmethod
+    async def create(cls, config_path: Optional[str] = None) -> "AirtableAIAgentBasic":
+        """Build an agent from inside a running event loop without blocking it on file I/O"""
+        config = await asyncio.to_thread(cls._load_config, config_path)
+        return cls(config=config)
+    
+    @staticmethod
+    def _load_config(config_path: Optional[str]) -> AgentConfig:
         """Load agent configuration"""
         if config_path and Path(config_path).exists():
             import yaml
+            loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
             with open(config_path, 'r') as f:
-                config_data = yaml.safe_load(f)
+                config_data = yaml.load(f, Loader=loader)
             return AgentConfig(**config_data)
         return AgentConfig()
     
@@ -109,49 +135,29 @@ class AirtableAIAgentBasic:
         """
         Process a user query about Airtable operations.
         """
-        self.metrics['requests_handled'] += 1
-        start_time = datetime.now()
+        self.metrics.requests_handled += 1
+        start_ns = time.perf_counter_ns()
         
         try:
-            self.logger.info(f"📝 Processing query: {query[:100]}...")
+            self.logger.info("📝 Processing query: %s...", query[:100])
             
             # Analyze query to determine intent and required context
             analysis = await self.airtable_expert.analyze_query(query)
-            self.logger.debug(f"Query analysis: {analysis}")
+            self.logger.debug("Query analysis: %s", analysis)
             
             # Prepare optimal context for the query
             context_chunks = await self.context_manager.get_relevant_context(
                 query=query,
-                analysis=analysis.__dict__ if hasattr(analysis, '__dict__') else None,
+                analysis=asdict(analysis) if is_dataclass(analysis) else None,
                 previous_context=context
             )
             
             # Determine required MCP operations
             operations = await self.airtable_expert.plan_operations(query, analysis)
-            self.logger.debug(f"Planned operations: {len(operations)}")
+            self.logger.debug("Planned operations: %d", len(operations))
             
             # Execute MCP operations
-            mcp_results = []
-            for operation in operations:
-                try:
-                    result = await self.mcp_client.execute_tool(
-                        operation.tool_name,
-                        operation.parameters
-                    )
-                    mcp_results.append({
-                        'operation': operation.tool_name,
-                        'success': True,
-                        'result': result
-                    })
-                    self.metrics['mcp_calls_made'] += 1
-                except MCPError as e:
-                    self.logger.error(f"MCP operation failed: {e}")
-                    mcp_results.append({
-                        'operation': operation.tool_name,
-                        'success': False,
-                        'error': str(e)
-                    })
-                    self.metrics['errors_handled'] += 1
+            mcp_results = await self._execute_operations(operations)
             
             # Generate comprehensive response
             response = await self.airtable_expert.generate_response(
@@ -164,30 +170,70 @@ class AirtableAIAgentBasic:
             # Add metadata
             response.update({
                 'metadata': {
-                    'processing_time': (datetime.now() - start_time).total_seconds(),
+                    'processing_time': (time.perf_counter_ns() - start_ns) / 1e9,
                     'context_chunks_used': len(context_chunks),
                     'mcp_operations_executed': len(operations),
-                    'timestamp': datetime.now(timezone.utc).isoformat()
+                    'timestamp': datetime.now(_UTC).isoformat()
                 }
             })
             
-            self.logger.info(f"✅ Query processed successfully in {response['metadata']['processing_time']:.2f}s")
+            self.logger.info("✅ Query processed successfully in %.2fs", response['metadata']['processing_time'])
             return response
             
         except Exception as e:
-            self.logger.error(f"❌ Error processing query: {e}")
-            self.metrics['errors_handled'] += 1
+            self.logger.error("❌ Error processing query: %s", e)
+            self.metrics.errors_handled += 1
             
             return {
                 'success': False,
                 'error': str(e),
                 'suggestions': await self.airtable_expert.get_error_suggestions(str(e)),
                 'metadata': {
-                    'processing_time': (datetime.now() - start_time).total_seconds(),
-                    'timestamp': datetime.now(timezone.utc).isoformat()
+                    'processing_time': (time.perf_counter_ns() - start_ns) / 1e9,
+                    'timestamp': datetime.now(_UTC).isoformat()
                 }
             }
     
+    async def _execute_operations(self, operations: List[AirtableOperation]) -> List[Dict[str, Any]]:
+        """Execute planned MCP operations concurrently, wave by wave"""
+        mcp_results: List[Optional[Dict[str, Any]]] = [None] * len(operations)
+        
+        for wave in group_operation_waves(operations):
+            outcomes = await asyncio.gather(
+                *(self._execute_operation(operations[i]) for i in wave),
+                return_exceptions=True
+            )
+            
+            for index, outcome in zip(wave, outcomes):
+                operation = operations[index]
+                if isinstance(outcome, MCPError):
+                    self.logger.error("MCP operation failed: %s", outcome)
+                    mcp_results[index] = {
+                        'operation': operation.tool_name,
+                        'success': False,
+                        'error': str(outcome)
+                    }
+                    self.metrics.errors_handled += 1
+                elif isinstance(outcome, BaseException):
+                    raise outcome
+                else:
+                    mcp_results[index] = {
+                        'operation': operation.tool_name,
+                        'success': True,
+                        'result': outcome
+                    }
+                    self.metrics.mcp_calls_made += 1
+        
+        return mcp_results
+    
+    async def _execute_operation(self, operation: AirtableOperation) -> Dict[str, Any]:
+        """Execute one MCP operation, bounded by the connection pool size"""
+        async with self._mcp_semaphore:
+            return await self.mcp_client.execute_tool(
+                operation.tool_name,
+                operation.parameters
+            )
+    
     async def get_capabilities(self) -> Dict[str, Any]:
         """Get comprehensive information about agent capabilities"""
         try:
@@ -222,7 +268,7 @@ class AirtableAIAgentBasic:
                     'Base Management'
                 ]
             },
-            'performance_metrics': self.metrics,
+            'performance_metrics': self.metrics.as_dict(),
             'context_management': {
                 'max_tokens': self.config.max_context_tokens,
                 'optimization_enabled': True,
@@ -254,24 +300,24 @@ class AirtableAIAgentBasic:
         
         return {
             'overall_status': 'healthy' if all_healthy else 'degraded',
-            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'timestamp': datetime.now(_UTC).isoformat(),
             'checks': checks,
-            'uptime': (datetime.now(timezone.utc) - self.metrics['start_time']).total_seconds(),
-            'metrics': self.metrics
+            'uptime': time.perf_counter() - self._started,
+            'metrics': self.metrics.as_dict()
         }
     
     def display_status(self) -> None:
         """Display current agent status"""
-        uptime = datetime.now(timezone.utc) - self.metrics['start_time']
+        uptime = timedelta(seconds=time.perf_counter() - self._started)
         
         print(f"\n🤖 {self.config.name} Status")
         print("-" * 40)
         print(f"Status: 🟢 Active")
         print(f"Uptime: {uptime}")
-        print(f"Requests Handled: {self.metrics['requests_handled']}")
-        print(f"MCP Calls Made: {self.metrics['mcp_calls_made']}")
-        print(f"Context Optimizations: {self.metrics['context_optimizations']}")
-        print(f"Errors Handled: {self.metrics['errors_handled']}")
+        print(f"Requests Handled: {self.metrics.requests_handled}")
+        print(f"MCP Calls Made: {self.metrics.mcp_calls_made}")
+        print(f"Context Optimizations: {self.metrics.context_optimizations}")
+        print(f"Errors Handled: {self.metrics.errors_handled}")
     
     async def shutdown(self) -> None:
         """Graceful shutdown of the agent"""
@@ -283,6 +329,10 @@ class AirtableAIAgentBasic:
         self.logger.info("✅ Agent shutdown complete")
 
 
+# REPL commands that end the interactive session
+_EXIT_COMMANDS = frozenset({'quit', 'exit', 'q'})
+
+
 async def main():
     """Main entry point for testing"""
     agent = AirtableAIAgentBasic()
@@ -299,9 +349,11 @@ async def main():
             try:
                 query = input("\nAsk me anything about Airtable: ")
                 
-                if query.lower() in ['quit', 'exit', 'q']:
+                command = query.strip().lower()
+                
+                if command in _EXIT_COMMANDS:
                     break
-                elif query.lower() == 'help':
+                elif command == 'help':
                     print("\nAvailable commands:")
                     print("• Ask any Airtable-related question")
                     print("• 'status' - Show agent status")
@@ -309,16 +361,16 @@ async def main():
                     print("• 'health' - Perform health check")
                     print("• 'quit' - Exit the agent")
                     continue
-                elif query.lower() == 'status':
+                elif command == 'status':
                     agent.display_status()
                     continue
-                elif query.lower() == 'capabilities':
+                elif command == 'capabilities':
                     caps = await agent.get_capabilities()
-                    print(json.dumps(caps, indent=2))
+                    print(dumps(caps, indent=True))
                     continue
-                elif query.lower() == 'health':
+                elif command == 'health':
                     health = await agent.health_check()
-                    print(json.dumps(health, indent=2))
+                    print(dumps(health, indent=True))
                     continue
                 
                 # Process the query
@@ -344,4 +396,11 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    try:
+        # libuv-based loop: higher throughput for the aiohttp-heavy MCP path
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    
+    asyncio.run(main())
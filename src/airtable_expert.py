@@ -7,11 +7,19 @@ Advanced Airtable knowledge and operation planning.
 import json
 import logging
 import re
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Tuple, Set
 from datetime import datetime
 from enum import Enum
 
+from .expert_core import complexity_code, count_conditional_words, extract_entities, find_record_ids, score_intents
+
+try:
+    import hyperscan
+except ImportError:  # pragma: no cover - optional speedup
+    hyperscan = None
+
 
 class QueryIntent(Enum):
     """Types of query intents"""
@@ -29,17 +37,93 @@ class QueryIntent(Enum):
     GENERAL_INFO = "general_info"       # General questions
 
 
-@dataclass
+# Intents that start out complex regardless of the query text
+_COMPLEX_INTENTS = frozenset({
+    QueryIntent.SCHEMA_MODIFY,
+    QueryIntent.BATCH_OPERATION,
+    QueryIntent.WEBHOOK_MANAGE
+})
+
+
+@dataclass(slots=True)
 class AirtableOperation:
     """Represents a planned Airtable operation"""
     tool_name: str
     parameters: Dict[str, Any]
     priority: int = 1
     description: str = ""
-    dependencies: List[str] = None  # Other operations this depends on
+    dependencies: List[str] = field(default_factory=list)  # Other operations this depends on
+
+
+# Ad-hoc planner patterns, compiled once
+_RE_FILTER = re.compile(r'(?i)\bwhere\b|\bfilter\b')
+_RE_CREATE_TABLE = re.compile(r'(?i)\bcreate.*table\b')
+_RE_CREATE_WEBHOOK = re.compile(r'(?i)\bcreate.*webhook\b')
+_RE_BATCH_CREATE = re.compile(r'(?i)\bcreate|add\b')
+_RE_BATCH_UPDATE = re.compile(r'(?i)\bupdate|modify\b')
+
+# Literal text every match of an entity type contains. Types whose keywords
+# are missing from an ASCII query are skipped; for ASCII text the lowercased
+# query agrees with the patterns' case-insensitive matching.
+_ENTITY_KEYWORDS = {
+    'table_names': ('table', 'in', 'from', 'to'),
+    'field_names': ('field', 'column'),
+    'record_ids': ('rec',),
+    'view_names': ('view',)
+}
+
+# Entity types with a dedicated scanner instead of regex patterns
+_ENTITY_SCANNERS = {
+    'record_ids': find_record_ids
+}
+
+# Complexity levels, indexed by complexity_code()
+_COMPLEXITY_LEVELS = ("simple", "medium", "complex")
+
+
+def _format_list_records(result: Dict[str, Any]) -> Optional[str]:
+    """Summarize a list_records result, if it reports what it found"""
+    records = result.get('content', [{}])[0].get('text', '')
+    return f"• {records}" if 'Found' in records else None
+
+
+# Per-tool summary lines for successful operations; other tools get a generic line
+_TOOL_FORMATTERS = {
+    'list_records': _format_list_records,
+    'create_record': lambda result: "• Record created successfully",
+    'list_tables': lambda result: "• Retrieved table information"
+}
+
+
+def group_operation_waves(operations: List[AirtableOperation]) -> List[List[int]]:
+    """
+    Group operations into waves that can run concurrently.
+    
+    An operation waits for every other planned operation whose tool name it
+    lists in ``dependencies``. Returns indices into ``operations``.
+    """
+    pending = list(range(len(operations)))
+    waves: List[List[int]] = []
+    
+    while pending:
+        pending_tools = {operations[i].tool_name for i in pending}
+        wave = [
+            i for i in pending
+            if not any(
+                dep in pending_tools and dep != operations[i].tool_name
+                for dep in operations[i].dependencies
+            )
+        ]
+        if not wave:
+            # Circular dependencies: fall back to running the rest together
+            wave = pending
+        waves.append(wave)
+        pending = [i for i in pending if i not in wave]
+    
+    return waves
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class QueryAnalysis:
     """Analysis of a user query"""
     intent: QueryIntent
@@ -58,9 +142,14 @@ class AirtableExpert:
     and response generation with deep Airtable expertise.
     """
     
-    def __init__(self):
+    def __init__(self, cache_size: int = 1024):
         self.logger = logging.getLogger("airtable_expert")
         
+        # LRU caches for repeated queries and error messages
+        self.cache_size = cache_size
+        self._analysis_cache: "OrderedDict[str, QueryAnalysis]" = OrderedDict()
+        self._error_suggestion_cache: "OrderedDict[str, List[str]]" = OrderedDict()
+        
         # Intent detection patterns
         self.intent_patterns = {
             QueryIntent.DATA_QUERY: [
@@ -138,6 +227,54 @@ class AirtableExpert:
             ]
         }
         
+        # Compile every pattern once (inline flags such as (?i) are preserved)
+        self.intent_patterns: Dict[QueryIntent, List[re.Pattern]] = {
+            intent: [re.compile(pattern) for pattern in patterns]
+            for intent, patterns in self.intent_patterns.items()
+        }
+        self.entity_patterns: Dict[str, List[re.Pattern]] = {
+            entity_type: [re.compile(pattern) for pattern in patterns]
+            for entity_type, patterns in self.entity_patterns.items()
+        }
+        
+        # One alternation per intent, used as a presence gate: a single scan
+        # rules out intents that have no matches at all
+        self._intent_matchers: Tuple[Tuple[QueryIntent, re.Pattern, Tuple[re.Pattern, ...]], ...] = tuple(
+            (
+                intent,
+                re.compile(
+                    '|'.join(f"(?:{pattern.pattern.removeprefix('(?i)')})" for pattern in patterns),
+                    re.IGNORECASE
+                ),
+                tuple(patterns)
+            )
+            for intent, patterns in self.intent_patterns.items()
+        )
+        
+        # Case-sensitive twins for matching a lowercased ASCII query, which sre
+        # runs faster than IGNORECASE (intent patterns are all lowercase)
+        self._intent_matchers_ascii: Tuple[Tuple[QueryIntent, re.Pattern, Tuple[re.Pattern, ...]], ...] = tuple(
+            (
+                intent,
+                re.compile(gate.pattern),
+                tuple(re.compile(pattern.pattern.removeprefix('(?i)')) for pattern in patterns)
+            )
+            for intent, gate, patterns in self._intent_matchers
+        )
+        self._hs_db, self._hs_intents = self._build_hyperscan_gate()
+        
+        # Operation planners per intent (intents without one plan nothing)
+        self._planners = {
+            QueryIntent.DATA_QUERY: self._plan_data_query,
+            QueryIntent.DATA_CREATE: self._plan_data_create,
+            QueryIntent.DATA_UPDATE: self._plan_data_update,
+            QueryIntent.DATA_DELETE: self._plan_data_delete,
+            QueryIntent.SCHEMA_QUERY: self._plan_schema_query,
+            QueryIntent.SCHEMA_MODIFY: self._plan_schema_modify,
+            QueryIntent.WEBHOOK_MANAGE: self._plan_webhook_manage,
+            QueryIntent.BATCH_OPERATION: self._plan_batch_operation
+        }
+        
         # Tool mapping for different operations
         self.intent_tool_mapping = {
             QueryIntent.DATA_QUERY: ['list_records', 'search_records', 'get_record'],
@@ -166,6 +303,26 @@ class AirtableExpert:
             QueryIntent.GENERAL_INFO: ['api', 'general']
         }
         
+        # Tools and context categories per intent, defaults filled in once
+        self._intent_routing: Dict[QueryIntent, Tuple[List[str], List[str]]] = {
+            intent: (
+                self.intent_tool_mapping.get(intent, []),
+                self.intent_context_mapping.get(intent, ['api'])
+            )
+            for intent in QueryIntent
+        }
+        
+        # Shared result for general queries where nothing was extracted
+        general_tools, general_categories = self._intent_routing[QueryIntent.GENERAL_INFO]
+        self._default_analysis = QueryAnalysis(
+            intent=QueryIntent.GENERAL_INFO,
+            confidence=0.5,
+            entities={},
+            required_tools=general_tools,
+            context_categories=general_categories,
+            complexity="simple"
+        )
+        
         self.logger.info("🧠 Airtable Expert initialized")
     
     async def initialize(self) -> None:
@@ -173,151 +330,145 @@ class AirtableExpert:
         # Could load additional models, knowledge bases, etc.
         self.logger.info("✅ Airtable Expert ready")
     
+    def _remember(self, cache: OrderedDict, key: str, value: Any) -> None:
+        """Store a value in an LRU cache, evicting the oldest entry when full"""
+        cache[key] = value
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+    
     async def analyze_query(self, query: str) -> QueryAnalysis:
         """Analyze a user query to determine intent and extract entities"""
+        return self._analyze_sync(query)
+    
+    def _analyze_sync(self, query: str) -> QueryAnalysis:
+        """Memoized analysis core shared by the async API"""
+        # Analysis is a pure function of the query text. Keyed on the exact
+        # text because entity extraction preserves case. Analyses are frozen
+        # since cached instances are shared between callers.
+        cached = self._analysis_cache.get(query)
+        if cached is not None:
+            self._analysis_cache.move_to_end(query)
+            return cached
+        
+        query_lower = query.lower()  # Shared by every stage below
         
         # Detect intent
-        intent, confidence = self._detect_intent(query)
+        intent, confidence = self._detect_intent(query, query_lower)
         
         # Extract entities
-        entities = self._extract_entities(query)
-        
-        # Determine required tools
-        required_tools = self.intent_tool_mapping.get(intent, [])
+        entities = self._extract_entities(query, query_lower)
         
-        # Determine context categories
-        context_categories = self.intent_context_mapping.get(intent, ['api'])
+        # Determine required tools and context categories
+        required_tools, context_categories = self._intent_routing[intent]
         
         # Assess complexity
-        complexity = self._assess_complexity(query, entities, intent)
-        
-        analysis = QueryAnalysis(
-            intent=intent,
-            confidence=confidence,
-            entities=entities,
-            required_tools=required_tools,
-            context_categories=context_categories,
-            complexity=complexity
-        )
+        complexity = self._assess_complexity(query, entities, intent, query_lower)
         
-        self.logger.debug(f"Query analysis: {intent.value} (confidence: {confidence:.2f})")
+        if intent is QueryIntent.GENERAL_INFO and not entities and complexity == "simple":
+            analysis = self._default_analysis
+        else:
+            analysis = QueryAnalysis(
+                intent=intent,
+                confidence=confidence,
+                entities=entities,
+                required_tools=required_tools,
+                context_categories=context_categories,
+                complexity=complexity
+            )
+        
+        self.logger.debug("Query analysis: %s (confidence: %.2f)", intent.value, confidence)
+        self._remember(self._analysis_cache, query, analysis)
         return analysis
     
-    def _detect_intent(self, query: str) -> Tuple[QueryIntent, float]:
-        """Detect the primary intent of a query"""
-        intent_scores = {}
+    def _build_hyperscan_gate(self) -> Tuple[Any, Tuple[QueryIntent, ...]]:
+        """Compile every intent pattern into one Hyperscan database, if available"""
+        if hyperscan is None:
+            return None, ()
         
+        expressions, owners = [], []
         for intent, patterns in self.intent_patterns.items():
-            score = 0
             for pattern in patterns:
-                matches = re.findall(pattern, query)
-                score += len(matches) * 1.0
-            
-            if score > 0:
-                intent_scores[intent] = score
+                expressions.append(pattern.pattern.removeprefix('(?i)').encode())
+                owners.append(intent)
+        
+        database = hyperscan.Database()
+        try:
+            database.compile(
+                expressions=expressions,
+                ids=list(range(len(expressions))),
+                elements=len(expressions),
+                flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(expressions)
+            )
+        except hyperscan.error as e:
+            self.logger.warning("Hyperscan unavailable for intent patterns: %s", e)
+            return None, ()
+        return database, tuple(owners)
+    
+    def _hyperscan_intents(self, query: str) -> Optional[Set[QueryIntent]]:
+        """Intents with at least one pattern match, found in a single scan"""
+        # Hyperscan's caseless matching and \b are ASCII-only
+        if self._hs_db is None or not query.isascii():
+            return None
         
-        if not intent_scores:
-            return QueryIntent.GENERAL_INFO, 0.5
+        found = set()
         
-        # Find highest scoring intent
-        best_intent = max(intent_scores, key=intent_scores.get)
-        max_score = intent_scores[best_intent]
+        def on_match(pattern_id, start, end, flags, context):
+            found.add(self._hs_intents[pattern_id])
+        
+        self._hs_db.scan(query.encode('ascii'), match_event_handler=on_match)
+        return found
+    
+    def _detect_intent(self, query: str, query_lower: Optional[str] = None) -> Tuple[QueryIntent, float]:
+        """Detect the primary intent of a query"""
+        candidates = self._hyperscan_intents(query)
+        
+        # Lowercasing only agrees with IGNORECASE for ASCII text
+        if query.isascii():
+            matchers = self._intent_matchers_ascii
+            text = query.lower() if query_lower is None else query_lower
+        else:
+            matchers, text = self._intent_matchers, query
+        
+        best_intent, max_score = score_intents(text, matchers, candidates)
+        
+        if best_intent is None:
+            return QueryIntent.GENERAL_INFO, 0.5
         
         # Calculate confidence (normalize to 0-1)
         confidence = min(1.0, max_score / 3.0)  # 3+ matches = high confidence
         
         return best_intent, confidence
     
-    def _extract_entities(self, query: str) -> Dict[str, List[str]]:
+    def _extract_entities(self, query: str, query_lower: Optional[str] = None) -> Dict[str, List[str]]:
         """Extract relevant entities from the query"""
-        entities = {}
-        
-        for entity_type, patterns in self.entity_patterns.items():
-            matches = []
-            for pattern in patterns:
-                found = re.findall(pattern, query)
-                matches.extend(found)
-            
-            # Clean and deduplicate matches
-            cleaned_matches = []
-            for match in matches:
-                if isinstance(match, tuple):
-                    match = match[0]  # Take first group if tuple
-                
-                match = match.strip().strip('"\',')
-                if match and match not in cleaned_matches:
-                    cleaned_matches.append(match)
-            
-            if cleaned_matches:
-                entities[entity_type] = cleaned_matches
+        if not query.isascii():
+            query_lower = None  # Keyword gating is only exact for ASCII
+        elif query_lower is None:
+            query_lower = query.lower()
         
-        return entities
+        return extract_entities(query, query_lower, self.entity_patterns, _ENTITY_KEYWORDS, _ENTITY_SCANNERS)
     
-    def _assess_complexity(self, query: str, entities: Dict, intent: QueryIntent) -> str:
+    def _assess_complexity(self, query: str, entities: Dict, intent: QueryIntent, query_lower: Optional[str] = None) -> str:
         """Assess the complexity of a query"""
-        complexity_score = 0
-        
-        # Base complexity by intent
-        complex_intents = [
-            QueryIntent.SCHEMA_MODIFY,
-            QueryIntent.BATCH_OPERATION, 
-            QueryIntent.WEBHOOK_MANAGE
-        ]
-        if intent in complex_intents:
-            complexity_score += 2
-        
-        # Add complexity for multiple entities
-        total_entities = sum(len(entities.get(k, [])) for k in entities)
-        complexity_score += min(total_entities / 3, 2)  # Cap entity contribution
-        
-        # Add complexity for query length (longer = more complex)
-        if len(query.split()) > 20:
-            complexity_score += 1
-        elif len(query.split()) > 10:
-            complexity_score += 0.5
-        
-        # Add complexity for conditional words
-        conditional_words = ['if', 'when', 'where', 'unless', 'provided', 'given']
-        for word in conditional_words:
-            if word.lower() in query.lower():
-                complexity_score += 0.5
-        
-        # Classify complexity
-        if complexity_score < 1:
-            return "simple"
-        elif complexity_score < 2.5:
-            return "medium"
-        else:
-            return "complex"
+        # Reduce the query to plain counts, then score them
+        if query_lower is None:
+            query_lower = query.lower()
+        code = complexity_code(
+            intent in _COMPLEX_INTENTS,
+            sum(map(len, entities.values())),
+            len(query.split()),
+            count_conditional_words(query_lower)
+        )
+        return _COMPLEXITY_LEVELS[code]
     
     async def plan_operations(self, query: str, analysis: QueryAnalysis) -> List[AirtableOperation]:
         """Plan the sequence of operations needed to fulfill a query"""
         operations = []
         
-        # Handle different intent types
-        if analysis.intent == QueryIntent.DATA_QUERY:
-            operations.extend(await self._plan_data_query(query, analysis))
-        
-        elif analysis.intent == QueryIntent.DATA_CREATE:
-            operations.extend(await self._plan_data_create(query, analysis))
-        
-        elif analysis.intent == QueryIntent.DATA_UPDATE:
-            operations.extend(await self._plan_data_update(query, analysis))
-        
-        elif analysis.intent == QueryIntent.DATA_DELETE:
-            operations.extend(await self._plan_data_delete(query, analysis))
-        
-        elif analysis.intent == QueryIntent.SCHEMA_QUERY:
-            operations.extend(await self._plan_schema_query(query, analysis))
-        
-        elif analysis.intent == QueryIntent.SCHEMA_MODIFY:
-            operations.extend(await self._plan_schema_modify(query, analysis))
-        
-        elif analysis.intent == QueryIntent.WEBHOOK_MANAGE:
-            operations.extend(await self._plan_webhook_manage(query, analysis))
-        
-        elif analysis.intent == QueryIntent.BATCH_OPERATION:
-            operations.extend(await self._plan_batch_operation(query, analysis))
+        # Dispatch to the planner for this intent type
+        planner = self._planners.get(analysis.intent)
+        if planner is not None:
+            operations.extend(planner(query, analysis))
         
         # If no specific operations planned, add a default schema query
         if not operations and analysis.intent != QueryIntent.GENERAL_INFO:
@@ -329,7 +480,7 @@ class AirtableExpert:
         
         return operations
     
-    async def _plan_data_query(self, query: str, analysis: QueryAnalysis) -> List[AirtableOperation]:
+    def _plan_data_query(self, query: str, analysis: QueryAnalysis) -> List[AirtableOperation]:
         """Plan operations for data queries"""
         operations = []
         
@@ -342,7 +493,7 @@ class AirtableExpert:
                 params = {"table": table_name}
                 
                 # Add basic filtering if detected
-                if re.search(r'(?i)\bwhere\b|\bfilter\b', query):
+                if _RE_FILTER.search(query):
                     # This would need more sophisticated parsing in a real implementation
                     params["maxRecords"] = 100
                 
@@ -362,7 +513,7 @@ class AirtableExpert:
         
         return operations
     
-    async def _plan_data_create(self, query: str, analysis: QueryAnalysis) -> List[AirtableOperation]:
+    def _plan_data_create(self, query: str, analysis: QueryAnalysis) -> List[AirtableOperation]:
         """Plan operations for data creation"""
         operations = []
         
@@ -389,7 +540,7 @@ class AirtableExpert:
         
         return operations
     
-    async def _plan_data_update(self, query: str, analysis: QueryAnalysis) -> List[AirtableOperation]:
+    def _plan_data_update(self, query: str, analysis: QueryAnalysis) -> List[AirtableOperation]:
         """Plan operations for data updates"""
         operations = []
         
@@ -418,7 +569,7 @@ class AirtableExpert:
         
         return operations
     
-    async def _plan_data_delete(self, query: str, analysis: QueryAnalysis) -> List[AirtableOperation]:
+    def _plan_data_delete(self, query: str, analysis: QueryAnalysis) -> List[AirtableOperation]:
         """Plan operations for data deletion"""
         operations = []
         
@@ -437,7 +588,7 @@ class AirtableExpert:
         
         return operations
     
-    async def _plan_schema_query(self, query: str, analysis: QueryAnalysis) -> List[AirtableOperation]:
+    def _plan_schema_query(self, query: str, analysis: QueryAnalysis) -> List[AirtableOperation]:
         """Plan operations for schema queries"""
         operations = []
         
@@ -461,11 +612,11 @@ class AirtableExpert:
         
         return operations
     
-    async def _plan_schema_modify(self, query: str, analysis: QueryAnalysis) -> List[AirtableOperation]:
+    def _plan_schema_modify(self, query: str, analysis: QueryAnalysis) -> List[AirtableOperation]:
         """Plan operations for schema modifications"""
         operations = []
         
-        if re.search(r'(?i)\bcreate.*table\b', query):
+        if _RE_CREATE_TABLE.search(query):
             # Extract table name and fields from query
             operations.append(AirtableOperation(
                 tool_name="create_table",
@@ -480,11 +631,11 @@ class AirtableExpert:
         
         return operations
     
-    async def _plan_webhook_manage(self, query: str, analysis: QueryAnalysis) -> List[AirtableOperation]:
+    def _plan_webhook_manage(self, query: str, analysis: QueryAnalysis) -> List[AirtableOperation]:
         """Plan webhook management operations"""
         operations = []
         
-        if re.search(r'(?i)\bcreate.*webhook\b', query):
+        if _RE_CREATE_WEBHOOK.search(query):
             operations.append(AirtableOperation(
                 tool_name="create_webhook",
                 parameters={
@@ -501,7 +652,7 @@ class AirtableExpert:
         
         return operations
     
-    async def _plan_batch_operation(self, query: str, analysis: QueryAnalysis) -> List[AirtableOperation]:
+    def _plan_batch_operation(self, query: str, analysis: QueryAnalysis) -> List[AirtableOperation]:
         """Plan batch operations"""
         operations = []
         
@@ -509,7 +660,7 @@ class AirtableExpert:
         
         if table_names:
             # Determine batch operation type from query
-            if re.search(r'(?i)\bcreate|add\b', query):
+            if _RE_BATCH_CREATE.search(query):
                 operations.append(AirtableOperation(
                     tool_name="batch_create_records",
                     parameters={
@@ -518,7 +669,7 @@ class AirtableExpert:
                     },
                     description=f"Batch create records in {table_names[0]}"
                 ))
-            elif re.search(r'(?i)\bupdate|modify\b', query):
+            elif _RE_BATCH_UPDATE.search(query):
                 operations.append(AirtableOperation(
                     tool_name="batch_update_records",
                     parameters={
@@ -545,14 +696,14 @@ class AirtableExpert:
         
         # Generate main response
         if analysis.intent == QueryIntent.GENERAL_INFO:
-            answer = await self._generate_general_response(query, context_chunks)
+            answer = self._generate_general_response(query, context_chunks)
         else:
-            answer = await self._generate_operation_response(
+            answer = self._generate_operation_response(
                 query, analysis, successful_operations, failed_operations
             )
         
         # Add helpful suggestions
-        suggestions = await self._generate_suggestions(query, analysis, mcp_results)
+        suggestions = self._generate_suggestions(query, analysis, mcp_results)
         
         # Format response
         response = {
@@ -577,7 +728,7 @@ class AirtableExpert:
         
         return response
     
-    async def _generate_general_response(self, query: str, context_chunks: List[Any]) -> str:
+    def _generate_general_response(self, query: str, context_chunks: List[Any]) -> str:
         """Generate response for general information queries"""
         
         # For general queries, provide information from context
@@ -591,7 +742,7 @@ class AirtableExpert:
         else:
             return "I can help you with Airtable operations including data management, schema design, formulas, apps, and more. What specific aspect would you like to know about?"
     
-    async def _generate_operation_response(
+    def _generate_operation_response(
         self,
         query: str,
         analysis: QueryAnalysis,
@@ -607,31 +758,27 @@ class AirtableExpert:
             
             for operation in successful_operations:
                 tool_name = operation.get('tool', 'unknown')
-                result = operation.get('result', {})
-                
-                if tool_name == 'list_records':
-                    records = result.get('content', [{}])[0].get('text', '')
-                    if 'Found' in records:
-                        response_parts.append(f"• {records}")
-                elif tool_name == 'create_record':
-                    response_parts.append("• Record created successfully")
-                elif tool_name == 'list_tables':
-                    response_parts.append("• Retrieved table information")
-                else:
+                formatter = _TOOL_FORMATTERS.get(tool_name)
+                if formatter is None:
                     response_parts.append(f"• {tool_name} completed")
+                    continue
+                
+                line = formatter(operation.get('result', {}))
+                if line:
+                    response_parts.append(line)
         
         if failed_operations:
             response_parts.append(f"\n❌ {len(failed_operations)} operation(s) failed:")
-            for operation in failed_operations:
-                error = operation.get('error', 'Unknown error')
-                response_parts.append(f"• {error}")
+            response_parts.extend(
+                f"• {operation.get('error', 'Unknown error')}" for operation in failed_operations
+            )
         
         if not response_parts:
             response_parts.append("No operations were executed. This might be a general information query.")
         
         return "\n".join(response_parts)
     
-    async def _generate_suggestions(
+    def _generate_suggestions(
         self,
         query: str,
         analysis: QueryAnalysis,
@@ -668,10 +815,15 @@ class AirtableExpert:
     
     async def get_error_suggestions(self, error_message: str) -> List[str]:
         """Get suggestions for handling specific errors"""
-        suggestions = []
-        
         error_lower = error_message.lower()
         
+        cached = self._error_suggestion_cache.get(error_lower)
+        if cached is not None:
+            self._error_suggestion_cache.move_to_end(error_lower)
+            return list(cached)
+        
+        suggestions = []
+        
         if "not found" in error_lower:
             suggestions.extend([
                 "Check that the table name is spelled correctly",
@@ -707,4 +859,6 @@ class AirtableExpert:
                 "Try a simpler version of the operation first"
             ])
         
-        return suggestions[:3]
\ No newline at end of file
+        suggestions = suggestions[:3]
+        self._remember(self._error_suggestion_cache, error_lower, suggestions)
+        return list(suggestions)
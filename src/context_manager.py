@@ -5,21 +5,72 @@ Intelligent context window management for optimal performance.
 """
 
 import asyncio
+import functools
 import hashlib
 import json
 import logging
-import pickle
+import os
+import re
 import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, asdict
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
 import numpy as np
 from sentence_transformers import SentenceTransformer
 import tiktoken
+import torch
 
+try:
+    import hnswlib
+except ImportError:  # pragma: no cover - optional speedup for large corpora
+    hnswlib = None
 
-@dataclass
+
+# Statements reused verbatim so sqlite3's statement cache skips re-parsing them
+_SQL_SELECT_CHUNKS = """
+    SELECT id, content, title, category, tokens, emb_row, relevance_score, last_accessed
+    FROM chunks
+    ORDER BY emb_row
+"""
+_SQL_UPSERT_CHUNK = """
+    INSERT OR REPLACE INTO chunks
+    (id, content, title, category, tokens, emb_row, relevance_score, last_accessed)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_UPDATE_ACCESS = """
+    UPDATE chunks
+    SET last_accessed = ?, relevance_score = ?
+    WHERE id = ?
+"""
+_SQL_UPSERT_EMBEDDING = """
+    INSERT OR REPLACE INTO embeddings (content_hash, model, embedding)
+    VALUES (?, ?, ?)
+"""
+_SQL_CLEAR_CHUNKS = "DELETE FROM chunks"
+_SQL_COUNT_CHUNKS = "SELECT COUNT(*) FROM chunks"
+
+# Embedded chunks needed per reduced dimension before the query projection is fitted;
+# PCA of n chunks has at most n - 1 directions, all of them about how sections differ
+PCA_SAMPLES_PER_DIM = 4
+
+
+def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first, ordered like a stable descending sort"""
+    n = scores.size
+    if k <= 0 or k >= n:
+        return np.argsort(-scores, kind='stable')[:k]
+    
+    # Keep everything tied with the k-th best score so ties resolve by index
+    threshold = np.partition(scores, n - k)[n - k]
+    candidates = np.flatnonzero(scores >= threshold)
+    return candidates[np.argsort(-scores[candidates], kind='stable')[:k]]
+
+
+@dataclass(slots=True)
 class DocumentChunk:
     """Represents a chunk of documentation with metadata"""
     id: str
@@ -27,9 +78,10 @@ class DocumentChunk:
     title: str
     category: str  # 'api', 'formulas', 'apps', 'mcp', etc.
     tokens: int
-    embedding: Optional[List[float]] = None
+    embedding: Optional[np.ndarray] = None  # Row of the manager's embedding matrix once loaded
     relevance_score: float = 0.0
-    last_accessed: Optional[datetime] = None
+    last_accessed: Optional[float] = None  # Epoch seconds
+    token_ids: Optional[np.ndarray] = None  # int32 encoding of content, kept for truncation
 
 
 class ContextManager:
@@ -43,23 +95,71 @@ class ContextManager:
     - Dynamic context adaptation based on query type
     """
     
-    def __init__(self, max_tokens: int = 128000, cache_dir: str = ".cache"):
+    def __init__(
+        self,
+        max_tokens: int = 128000,
+        cache_dir: str = ".cache",
+        embedding_model: str = "all-MiniLM-L6-v2",
+        reduced_dim: int = 128,
+        query_cache_size: int = 1024,
+        embedding_backend: str = "torch",
+        embedding_file: Optional[str] = None,
+        ann_threshold: int = 10000
+    ):
         self.max_tokens = max_tokens
+        self.embedding_model = embedding_model
+        # "onnx" or "openvino" run the model without PyTorch; embedding_file picks
+        # an exported variant, e.g. "onnx/model_qint8_avx512_vnni.onnx"
+        self.embedding_backend = embedding_backend
+        self.embedding_file = embedding_file
+        # Vectors differ between backends/variants, so caches are keyed by both
+        self.embedding_key = embedding_model
+        if embedding_backend != "torch":
+            self.embedding_key += f"@{embedding_backend}:{embedding_file or 'default'}"
+        self.reduced_dim = reduced_dim
+        self.query_cache_size = query_cache_size
+        # Corpora at least this large are searched through an HNSW index (needs hnswlib)
+        self.ann_threshold = ann_threshold
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
         
         # Initialize components
         self.tokenizer = tiktoken.get_encoding("cl100k_base")  # Claude tokenizer
         self.embedder = None  # Lazy load
+        self._embed_executor: Optional[ThreadPoolExecutor] = None
+        self._db_executor: Optional[ThreadPoolExecutor] = None
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()  # LRU of query embeddings
         self.logger = logging.getLogger("context_manager")
         
-        # Document storage
+        # Document storage; _chunks_version changes whenever the chunk list does
+        self._chunks_version = 0
         self.chunks: List[DocumentChunk] = []
         self.chunk_index: Dict[str, DocumentChunk] = {}
         
+        # All chunk embeddings as one float32 matrix; rows follow _matrix_chunks
+        self.embedding_matrix: Optional[np.ndarray] = None
+        self._matrix_chunks: List[DocumentChunk] = []
+        self.row_of_id: Dict[str, int] = {}
+        # Per-row category ids (into _category_names) and last access epochs
+        self._category_names: List[str] = []
+        self._category_ids = np.zeros(0, dtype=np.intp)
+        self._priority_vecs: Dict[Optional[str], np.ndarray] = {}  # Category boosts per intent
+        self._last_access = np.zeros(0)
+        self._matrix_key: Optional[int] = None
+        
+        # Approximate nearest-neighbour index and the matrix key it was built for
+        self._ann_index: Optional[Any] = None
+        self._ann_key: Optional[int] = None
+        
+        # PCA projection for compact query vectors (fitted on doc embeddings)
+        self._pca_mean: Optional[np.ndarray] = None
+        self._pca_components: Optional[np.ndarray] = None
+        
         # Database for persistent storage
         self.db_path = self.cache_dir / "context.db"
-        self._init_database()
+        self._conn: Optional[sqlite3.Connection] = None  # Opened on the DB thread on first use
+        # Chunk embeddings live in a .npy file that is memory-mapped on load
+        self.embedding_path = self.cache_dir / f"embeddings_{self._file_key}.npy"
         
         # Performance tracking
         self.stats = {
@@ -70,9 +170,72 @@ class ContextManager:
             'context_optimizations': 0
         }
     
-    def _init_database(self) -> None:
+    @property
+    def chunks(self) -> List[DocumentChunk]:
+        """Document chunks; assigning a new list invalidates the embedding matrix"""
+        return self._chunks
+    
+    @chunks.setter
+    def chunks(self, chunks: List[DocumentChunk]) -> None:
+        self._chunks = chunks
+        self.invalidate_embedding_matrix()
+    
+    def invalidate_embedding_matrix(self) -> None:
+        """Rebuild the embedding matrix and ANN index on next use; call after editing chunks in place"""
+        self._chunks_version += 1
+    
+    @property
+    def _file_key(self) -> str:
+        """embedding_key made safe for use in file names"""
+        return re.sub(r'[^\w.-]', '_', self.embedding_key)
+    
+    def _get_connection(self) -> sqlite3.Connection:
+        """Return the shared SQLite connection, opening it on first use"""
+        if self._conn is None:
+            # Autocommit mode: transactions are opened explicitly where needed
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            # WAL with relaxed sync: no fsync per commit, readers never block the writer
+            for pragma in (
+                "journal_mode=WAL",
+                "synchronous=NORMAL",
+                "temp_store=MEMORY",
+                "mmap_size=268435456",  # 256 MB
+                "cache_size=-65536"     # 64 MB
+            ):
+                self._conn.execute(f"PRAGMA {pragma}")
+            self._init_database(self._conn)
+        return self._conn
+    
+    async def _run_db(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run func(connection, *args) on the dedicated DB thread so the event loop stays free"""
+        if self._db_executor is None:
+            # One thread serializes access to the shared connection
+            self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="context-db")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._db_executor,
+            lambda: func(self._get_connection(), *args)
+        )
+    
+    @staticmethod
+    def _db_fetchall(conn: sqlite3.Connection, sql: str, params: Sequence[Any] = ()) -> List[Tuple]:
+        """Run a query and return all rows"""
+        return conn.execute(sql, params).fetchall()
+    
+    @staticmethod
+    def _db_executemany(conn: sqlite3.Connection, sql: str, rows: List[Sequence[Any]]) -> None:
+        """Run a statement for every row in one transaction"""
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(sql, rows)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    
+    def _init_database(self, conn: sqlite3.Connection) -> None:
         """Initialize SQLite database for chunk storage"""
-        conn = sqlite3.connect(self.db_path)
+        conn.execute("BEGIN")
         conn.execute("""
             CREATE TABLE IF NOT EXISTS chunks (
                 id TEXT PRIMARY KEY,
@@ -80,27 +243,55 @@ class ContextManager:
                 title TEXT NOT NULL,
                 category TEXT NOT NULL,
                 tokens INTEGER NOT NULL,
-                embedding BLOB,
+                emb_row INTEGER,
                 relevance_score REAL DEFAULT 0.0,
-                last_accessed TIMESTAMP,
+                last_accessed REAL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                content_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                PRIMARY KEY (content_hash, model)
+            )
+        """)
+        
+        # Older databases kept pickled embeddings per row; drop them so the
+        # documentation is re-ingested (cheaply, via the embedding cache)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(chunks)")}
+        if 'emb_row' not in columns:
+            conn.execute("DELETE FROM chunks")
+            conn.execute("ALTER TABLE chunks ADD COLUMN emb_row INTEGER")
+        
         conn.execute("""
             CREATE INDEX IF NOT EXISTS idx_category ON chunks (category)
         """)
         conn.execute("""
             CREATE INDEX IF NOT EXISTS idx_relevance ON chunks (relevance_score DESC)
         """)
-        conn.commit()
-        conn.close()
+        conn.execute("COMMIT")
     
     async def initialize(self) -> None:
         """Initialize the context manager with all documentation"""
         self.logger.info("🔄 Initializing context manager...")
         
+        # Intra-op threads for the model are opt-in; torch's default can leave cores idle
+        threads = os.environ.get("CONTEXT_THREADS")
+        if threads:
+            torch.set_num_threads(int(threads))
+        
         # Load embedding model
-        self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
+        if self.embedding_backend == "torch":
+            self.embedder = SentenceTransformer(self.embedding_model)
+        else:
+            model_kwargs = {'file_name': self.embedding_file} if self.embedding_file else None
+            self.embedder = SentenceTransformer(
+                self.embedding_model,
+                backend=self.embedding_backend,
+                model_kwargs=model_kwargs
+            )
         self.logger.info("✅ Embedding model loaded")
         
         # Load existing chunks from database
@@ -110,19 +301,32 @@ class ContextManager:
         if not self.chunks:
             await self._process_documentation()
         
+        self._fit_query_projection()
+        self._build_ann_index()
+        
         self.logger.info(f"✅ Context manager initialized with {len(self.chunks)} chunks")
     
     async def _load_chunks_from_db(self) -> None:
         """Load chunks from persistent storage"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.execute("""
-            SELECT id, content, title, category, tokens, embedding, relevance_score, last_accessed
-            FROM chunks
-        """)
+        rows = await self._run_db(self._db_fetchall, _SQL_SELECT_CHUNKS)
+        
+        if not rows:
+            return
         
-        for row in cursor.fetchall():
-            embedding = pickle.loads(row[5]) if row[5] else None
-            last_accessed = datetime.fromisoformat(row[7]) if row[7] else None
+        # Embedded chunks must map one-to-one, in order, onto the file's rows
+        matrix = self._open_embedding_file()
+        emb_rows = [row[5] for row in rows if row[5] is not None]
+        if matrix is None or emb_rows != list(range(len(matrix))):
+            self.logger.warning("⚠️ Embedding file missing or out of sync, rebuilding chunk cache")
+            await self._run_db(self._db_executemany, _SQL_CLEAR_CHUNKS, [()])
+            return
+        
+        embedded = []
+        for row in rows:
+            embedding = matrix[row[5]] if row[5] is not None else None
+            last_accessed = row[7]
+            if isinstance(last_accessed, str):  # ISO timestamps from older databases
+                last_accessed = datetime.fromisoformat(last_accessed).timestamp()
             
             chunk = DocumentChunk(
                 id=row[0],
@@ -137,8 +341,11 @@ class ContextManager:
             
             self.chunks.append(chunk)
             self.chunk_index[chunk.id] = chunk
+            if embedding is not None:
+                embedded.append(chunk)
         
-        conn.close()
+        self.invalidate_embedding_matrix()
+        self._set_embedding_matrix(matrix, embedded)
         self.stats['total_chunks'] = len(self.chunks)
         
         if self.chunks:
@@ -157,50 +364,75 @@ class ContextManager:
             ("airtable-apps-extensions.md", "apps")
         ]
         
-        for filename, category in doc_files:
-            file_path = docs_dir / filename
-            if file_path.exists():
-                await self._process_file(file_path, category)
-    
-    async def _process_file(self, file_path: Path, category: str) -> None:
-        """Process a single documentation file into chunks"""
-        self.logger.info(f"📄 Processing {file_path.name}...")
+        # Read and chunk files concurrently, then embed all chunks in one batch
+        files = [(docs_dir / filename, category) for filename, category in doc_files]
+        chunked = await asyncio.gather(*(
+            asyncio.to_thread(self._chunk_file, file_path, category)
+            for file_path, category in files
+            if file_path.exists()
+        ))
         
+        pending = [chunk for file_chunks in chunked for chunk in file_chunks]
+        await self._ingest_chunks(pending)
+    
+    def _chunk_file(self, file_path: Path, category: str) -> List[Tuple[str, str, str]]:
+        """Read a documentation file and split it into (content, title, category) chunks"""
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
         # Split into logical chunks (sections, subsections)
         chunks = self._smart_chunking(content, file_path.stem)
+        self.logger.info(f"📄 Chunked {file_path.name}: {len(chunks)} chunks")
+        return [(chunk_content, title, category) for chunk_content, title in chunks]
+    
+    async def _process_file(self, file_path: Path, category: str) -> None:
+        """Process a single documentation file into chunks"""
+        await self._ingest_chunks(self._chunk_file(file_path, category))
+    
+    async def _ingest_chunks(self, pending: List[Tuple[str, str, str]]) -> None:
+        """Embed, tokenize and store (content, title, category) chunks"""
+        if not pending:
+            return
+        
+        # Embed only chunks whose content is not already cached
+        contents = [chunk_content for chunk_content, _, _ in pending]
+        embeddings = await self._embed_with_cache(contents)
         
-        # Process each chunk
-        for chunk_content, title in chunks:
+        # Tokenize every chunk in one batched tokenizer call
+        token_lists = self.tokenizer.encode_batch(contents)
+        
+        new_chunks = []
+        for (chunk_content, title, category), embedding, token_ids in zip(pending, embeddings, token_lists):
             chunk_id = hashlib.sha256(
                 (chunk_content + title + category).encode()
             ).hexdigest()[:16]
             
-            tokens = len(self.tokenizer.encode(chunk_content))
-            
-            # Generate embedding
-            embedding = self.embedder.encode(chunk_content).tolist()
-            self.stats['embeddings_computed'] += 1
-            
             chunk = DocumentChunk(
                 id=chunk_id,
                 content=chunk_content,
                 title=title,
                 category=category,
-                tokens=tokens,
-                embedding=embedding
+                tokens=len(token_ids),
+                embedding=embedding,
+                token_ids=np.asarray(token_ids, dtype=np.int32)
             )
             
-            # Save to database
-            await self._save_chunk(chunk)
-            
+            new_chunks.append(chunk)
             self.chunks.append(chunk)
             self.chunk_index[chunk_id] = chunk
         
+        self.invalidate_embedding_matrix()
+        
+        # Rewrite the embedding file so its rows follow the in-memory matrix
+        matrix, _ = self._get_embedding_matrix()
+        if matrix is not None:
+            self._write_embedding_file(matrix)
+        
+        # Save to database in one transaction
+        await self._save_chunks(new_chunks)
+        
         self.stats['total_chunks'] = len(self.chunks)
-        self.logger.info(f"✅ Processed {file_path.name}: {len(chunks)} chunks")
+        self.logger.info(f"✅ Processed {len(new_chunks)} chunks")
     
     def _smart_chunking(self, content: str, title_prefix: str) -> List[Tuple[str, str]]:
         """Intelligently split content into meaningful chunks"""
@@ -241,118 +473,351 @@ class ContextManager:
         
         return chunks
     
+    @staticmethod
+    def _content_hash(content: str) -> str:
+        """Stable key for embedding cache lookups"""
+        return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+    
+    async def _embed_with_cache(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, reusing cached embeddings keyed by (content hash, model)"""
+        hashes = [self._content_hash(text) for text in texts]
+        
+        cached: Dict[str, List[float]] = {}
+        unique_hashes = list(set(hashes))
+        for start in range(0, len(unique_hashes), 500):  # Stay under SQLite's variable limit
+            batch = unique_hashes[start:start + 500]
+            placeholders = ','.join('?' * len(batch))
+            found = await self._run_db(
+                self._db_fetchall,
+                f"SELECT content_hash, embedding FROM embeddings "
+                f"WHERE model = ? AND content_hash IN ({placeholders})",
+                (self.embedding_key, *batch)
+            )
+            for content_hash, blob in found:
+                cached[content_hash] = np.frombuffer(blob, dtype=np.float32).tolist()
+        
+        uncached_indices = [
+            i for i, content_hash in enumerate(hashes) if content_hash not in cached
+        ]
+        self.stats['cache_hits'] += len(texts) - len(uncached_indices)
+        self.stats['cache_misses'] += len(uncached_indices)
+        
+        if uncached_indices:
+            # Encode each distinct missing text once; the model already sorts
+            # its inputs by length into batches, so no extra ordering is needed
+            missing = {hashes[i]: texts[i] for i in uncached_indices}
+            vectors = await self._encode(list(missing.values()))
+            self.stats['embeddings_computed'] += len(missing)
+            
+            rows = []
+            for content_hash, vector in zip(missing, vectors):
+                vector = np.asarray(vector, dtype=np.float32)
+                cached[content_hash] = vector.tolist()
+                rows.append((content_hash, self.embedding_key, vector.tobytes()))
+            
+            await self._run_db(self._db_executemany, _SQL_UPSERT_EMBEDDING, rows)
+        
+        return [cached[content_hash] for content_hash in hashes]
+    
     async def _save_chunk(self, chunk: DocumentChunk) -> None:
         """Save chunk to persistent storage"""
-        conn = sqlite3.connect(self.db_path)
+        await self._save_chunks([chunk])
+    
+    async def _save_chunks(self, chunks: List[DocumentChunk]) -> None:
+        """Save chunks to persistent storage in a single transaction"""
+        if not chunks:
+            return
         
-        embedding_blob = pickle.dumps(chunk.embedding) if chunk.embedding else None
+        await self._run_db(self._db_executemany, _SQL_UPSERT_CHUNK, [
+            (
+                chunk.id,
+                chunk.content,
+                chunk.title,
+                chunk.category,
+                chunk.tokens,
+                self.row_of_id.get(chunk.id),
+                chunk.relevance_score,
+                chunk.last_accessed
+            )
+            for chunk in chunks
+        ])
+    
+    async def _encode(self, texts: Any, **kwargs) -> Any:
+        """Run the embedding model in a worker thread so the event loop stays free"""
+        if self._embed_executor is None:
+            # One worker: the shared model's tokenizer isn't thread-safe, and torch
+            # already parallelizes inside a single encode call
+            self._embed_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedder")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._embed_executor,
+            functools.partial(self.embedder.encode, texts, **kwargs)
+        )
+    
+    async def embed(self, text: str) -> np.ndarray:
+        """Embed text with the documentation embedding model"""
+        return await self._embed_query(text)
+    
+    async def _embed_query(self, query: str) -> np.ndarray:
+        """Embed a query, reusing the result for repeated queries"""
+        vector = self._query_cache.get(query)
+        if vector is not None:
+            self._query_cache.move_to_end(query)
+            self.stats['cache_hits'] += 1
+            return vector
+        
+        self.stats['cache_misses'] += 1
+        vector = np.asarray(await self._encode(query), dtype=np.float32)
+        vector.setflags(write=False)  # Shared between callers
+        
+        self._query_cache[query] = vector
+        if len(self._query_cache) > self.query_cache_size:
+            self._query_cache.popitem(last=False)
+        return vector
+    
+    async def embed_batch(self, texts: List[str], batch_size: int = 32) -> List[np.ndarray]:
+        """Embed several texts with a single batched model call"""
+        if not texts:
+            return []
+        return list(await self._encode(texts, batch_size=batch_size))
+    
+    async def reduce_embedding(self, embedding: Any) -> np.ndarray:
+        """Project an embedding onto the PCA basis used for cheap similarity checks"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        if self._pca_components is None:
+            return vector
+        return (vector - self._pca_mean) @ self._pca_components.T
+    
+    def _get_embedding_matrix(self) -> Tuple[Optional[np.ndarray], List[DocumentChunk]]:
+        """Return the embedding matrix and its chunks, rebuilt when self.chunks changes"""
+        if self._chunks_version != self._matrix_key:
+            embedded = [chunk for chunk in self.chunks if chunk.embedding is not None]
+            matrix = None
+            if embedded:
+                # float32 on purpose: NumPy has no integer BLAS, so an int8 copy
+                # scores several times slower and loses precision
+                matrix = np.ascontiguousarray(
+                    np.asarray([chunk.embedding for chunk in embedded], dtype=np.float32)
+                )
+                # Chunks keep a view of their row instead of a separate copy
+                for chunk, row in zip(embedded, matrix):
+                    chunk.embedding = row
+            
+            self._set_embedding_matrix(matrix, embedded)
         
-        conn.execute("""
-            INSERT OR REPLACE INTO chunks
-            (id, content, title, category, tokens, embedding, relevance_score, last_accessed)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            chunk.id,
-            chunk.content,
-            chunk.title,
-            chunk.category,
-            chunk.tokens,
-            embedding_blob,
-            chunk.relevance_score,
-            chunk.last_accessed.isoformat() if chunk.last_accessed else None
-        ))
+        return self.embedding_matrix, self._matrix_chunks
+    
+    def _set_embedding_matrix(self, matrix: Optional[np.ndarray], embedded: List[DocumentChunk]) -> None:
+        """Install a matrix whose rows hold the embeddings of ``embedded``, in order"""
+        self.embedding_matrix = matrix
+        self._matrix_chunks = embedded
+        self.row_of_id = {chunk.id: row for row, chunk in enumerate(embedded)}
+        
+        category_lookup: Dict[str, int] = {}
+        self._category_ids = np.array(
+            [category_lookup.setdefault(chunk.category, len(category_lookup)) for chunk in embedded],
+            dtype=np.intp
+        )
+        self._category_names = list(category_lookup)
+        self._priority_vecs = {}
+        self._last_access = np.array([
+            chunk.last_accessed if chunk.last_accessed is not None else np.nan
+            for chunk in embedded
+        ])
+        self._matrix_key = self._chunks_version
+    
+    def _open_embedding_file(self) -> Optional[np.ndarray]:
+        """Memory-map the stored embedding matrix, or return None if it is unusable"""
+        try:
+            matrix = np.load(self.embedding_path, mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        
+        if matrix.ndim != 2 or matrix.dtype != np.float32:
+            return None
+        return matrix
+    
+    def _write_embedding_file(self, matrix: np.ndarray) -> None:
+        """Atomically replace the stored embedding matrix"""
+        tmp_path = self.embedding_path.with_name(self.embedding_path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.save(f, matrix)
+        os.replace(tmp_path, self.embedding_path)
+    
+    def _fit_query_projection(self) -> None:
+        """
+        Fit (or load) a PCA projection of the documentation embeddings.
+        
+        Skipped, leaving query vectors at full dimension, unless the corpus has
+        PCA_SAMPLES_PER_DIM chunks per reduced dimension: on a small corpus the
+        basis only spans differences between sections and would project away
+        query details such as table or record names.
+        """
+        self._pca_mean = None
+        self._pca_components = None
+        matrix, embedded = self._get_embedding_matrix()
+        if len(embedded) < PCA_SAMPLES_PER_DIM * self.reduced_dim:
+            return
         
-        conn.commit()
-        conn.close()
+        fingerprint = hashlib.blake2b(
+            '|'.join(sorted(chunk.id for chunk in embedded)).encode(),
+            digest_size=16
+        ).hexdigest()
+        projection_path = self.cache_dir / f"pca_{self._file_key}_{self.reduced_dim}.npz"
+        
+        if projection_path.exists():
+            saved = np.load(projection_path)
+            if str(saved['fingerprint']) == fingerprint:
+                self._pca_mean = saved['mean']
+                self._pca_components = saved['components']
+                return
+        
+        mean = matrix.mean(axis=0)
+        _, _, vt = np.linalg.svd(matrix - mean, full_matrices=False)
+        
+        self._pca_mean = mean
+        self._pca_components = np.ascontiguousarray(vt[:self.reduced_dim])
+        np.savez(
+            projection_path,
+            mean=self._pca_mean,
+            components=self._pca_components,
+            fingerprint=fingerprint
+        )
+        self.logger.info(
+            f"📉 Query projection fitted: {matrix.shape[1]} → {self._pca_components.shape[0]} dims"
+        )
+    
+    def _build_ann_index(self) -> None:
+        """Build (or load) an HNSW index over the embedding matrix for large corpora"""
+        self._ann_index = None
+        matrix, embedded = self._get_embedding_matrix()
+        if hnswlib is None or len(embedded) < self.ann_threshold:
+            return
+        
+        # Index labels are matrix rows, so the fingerprint follows row order
+        fingerprint = hashlib.blake2b(
+            '|'.join(chunk.id for chunk in embedded).encode(),
+            digest_size=8
+        ).hexdigest()
+        index_path = self.cache_dir / f"ann_{self._file_key}_{fingerprint}.bin"
+        
+        # Inner product matches the exact scores, which are plain dot products
+        index = hnswlib.Index(space='ip', dim=matrix.shape[1])
+        if index_path.exists():
+            index.load_index(str(index_path), max_elements=len(embedded))
+        else:
+            index.init_index(max_elements=len(embedded), ef_construction=200, M=16)
+            index.add_items(matrix, np.arange(len(embedded)))
+            index.save_index(str(index_path))
+        
+        self._ann_index = index
+        self._ann_key = self._matrix_key
+        self.logger.info(f"🧭 ANN index ready for {len(embedded)} chunks")
     
     async def get_relevant_context(
         self,
         query: str,
-        analysis: Optional[Dict[str, Any]] = None,
+        analysis: Optional[Any] = None,  # QueryAnalysis or an analysis dict
         previous_context: Optional[Dict[str, Any]] = None,
-        max_chunks: int = 10
+        max_chunks: int = 10,
+        query_embedding: Optional[np.ndarray] = None
     ) -> List[DocumentChunk]:
         """Get the most relevant context chunks for a query"""
         
-        # Generate query embedding
-        query_embedding = self.embedder.encode(query)
-        
-        # Calculate relevance scores for all chunks
-        relevant_chunks = []
-        
-        for chunk in self.chunks:
-            if chunk.embedding is None:
-                continue
-            
-            # Semantic similarity
-            semantic_score = np.dot(query_embedding, chunk.embedding)
-            
-            # Category boost based on analysis
-            category_boost = self._get_category_boost(chunk.category, analysis)
-            
-            # Recency boost for recently accessed chunks
-            recency_boost = self._get_recency_boost(chunk)
-            
-            # Combined relevance score
-            relevance_score = semantic_score + category_boost + recency_boost
-            
-            chunk.relevance_score = relevance_score
-            chunk.last_accessed = datetime.now()
+        # Generate query embedding unless the caller already has one
+        if query_embedding is None:
+            query_embedding = await self._embed_query(query)
+        
+        # Semantic similarity for every candidate chunk in one matrix-vector product
+        matrix, embedded = self._get_embedding_matrix()
+        rows = self._get_candidate_rows(query_embedding, max_chunks)
+        candidates = embedded if isinstance(rows, slice) else [embedded[i] for i in rows]
+        now = time.time()
+        scores = np.zeros(0)
+        if matrix is not None:
+            semantic_scores = (matrix[rows] @ np.asarray(query_embedding, dtype=np.float32)).astype(np.float64)
             
-            relevant_chunks.append(chunk)
+            # Combined relevance score with category and recency boosts
+            scores = (
+                semantic_scores
+                + self._build_priority_vec(analysis)[self._category_ids[rows]]
+                + self._get_recency_boosts(now, rows)
+            )
         
-        # Sort by relevance and select top chunks
-        relevant_chunks.sort(key=lambda x: x.relevance_score, reverse=True)
-        selected_chunks = relevant_chunks[:max_chunks]
+        # Select top chunks without sorting every score
+        top = _top_k_indices(scores, max_chunks)
+        selected_chunks = [candidates[i] for i in top]
+        for chunk, relevance_score in zip(selected_chunks, scores[top].tolist()):
+            chunk.relevance_score = relevance_score
         
         # Optimize for token limit
         optimized_chunks = await self._optimize_for_tokens(selected_chunks)
         
+        # Only returned chunks (a prefix of the selection) count as accessed
+        accessed = len(optimized_chunks)
+        for chunk in selected_chunks[:accessed] + optimized_chunks:
+            chunk.last_accessed = now
+        accessed_rows = top[:accessed] if isinstance(rows, slice) else rows[top[:accessed]]
+        self._last_access[accessed_rows] = now
+        
         # Update access times in database
         await self._update_access_times(optimized_chunks)
         
         self.stats['context_optimizations'] += 1
         
-        self.logger.debug(f"🎯 Selected {len(optimized_chunks)} context chunks for query")
+        self.logger.debug("🎯 Selected %d context chunks for query", len(optimized_chunks))
         return optimized_chunks
     
-    def _get_category_boost(self, category: str, analysis: Optional[Dict[str, Any]]) -> float:
-        """Calculate category relevance boost based on query analysis"""
-        if not analysis:
-            return 0.0
+    def _get_candidate_rows(self, query_embedding: Any, max_chunks: int) -> Any:
+        """Matrix rows to score exactly: ANN neighbours for large corpora, otherwise all rows"""
+        if self._ann_index is None or self._ann_key != self._matrix_key:
+            return slice(None)
+        
+        # Over-fetch so category/recency boosts can still reorder the shortlist
+        k = min(self._ann_index.get_current_count(), max(max_chunks, 1) * 3)
+        self._ann_index.set_ef(max(200, k))
+        labels, _ = self._ann_index.knn_query(np.asarray(query_embedding, dtype=np.float32), k=k)
+        return np.sort(labels[0].astype(np.intp))  # Row order keeps tie-breaking stable
+    
+    def _build_priority_vec(self, analysis: Any) -> np.ndarray:
+        """Category boost indexed by category id, computed once per analysis intent"""
+        intent = None
+        if analysis:
+            # Accept analysis dicts as well as QueryAnalysis objects with enum intents
+            intent = analysis.get('intent', '') if isinstance(analysis, dict) else getattr(analysis, 'intent', '')
+            intent = str(getattr(intent, 'value', intent)).lower()
+        
+        priority_vec = self._priority_vecs.get(intent)
+        if priority_vec is not None:
+            return priority_vec
         
         # Category priority mapping based on analysis
-        category_priorities = {
-            'api': 0.3,
-            'javascript': 0.2,
-            'mcp': 0.4,
-            'formulas': 0.1,
-            'apps': 0.1
-        }
-        
-        # Adjust based on analysis
-        intent = analysis.get('intent', '')
-        if 'formula' in intent.lower():
-            category_priorities['formulas'] = 0.4
-        elif 'app' in intent.lower() or 'extension' in intent.lower():
-            category_priorities['apps'] = 0.4
-        elif 'mcp' in intent.lower() or 'tool' in intent.lower():
-            category_priorities['mcp'] = 0.5
-        
-        return category_priorities.get(category, 0.0)
-    
-    def _get_recency_boost(self, chunk: DocumentChunk) -> float:
-        """Calculate recency boost for recently accessed chunks"""
-        if not chunk.last_accessed:
-            return 0.0
-        
-        time_diff = datetime.now() - chunk.last_accessed
-        if time_diff < timedelta(hours=1):
-            return 0.2
-        elif time_diff < timedelta(days=1):
-            return 0.1
-        else:
-            return 0.0
+        category_priorities = {}
+        if intent is not None:
+            category_priorities = {
+                'api': 0.3,
+                'javascript': 0.2,
+                'mcp': 0.4,
+                'formulas': 0.1,
+                'apps': 0.1
+            }
+            
+            # Adjust based on analysis
+            if 'formula' in intent:
+                category_priorities['formulas'] = 0.4
+            elif 'app' in intent or 'extension' in intent:
+                category_priorities['apps'] = 0.4
+            elif 'mcp' in intent or 'tool' in intent:
+                category_priorities['mcp'] = 0.5
+        
+        priority_vec = np.array([category_priorities.get(name, 0.0) for name in self._category_names])
+        self._priority_vecs[intent] = priority_vec
+        return priority_vec
+    
+    def _get_recency_boosts(self, now: float, rows: Any = slice(None)) -> np.ndarray:
+        """Recency boost for the given matrix rows; never-accessed rows (NaN) get none"""
+        age = now - self._last_access[rows]
+        return np.where(age < 3600, 0.2, np.where(age < 86400, 0.1, 0.0))  # < 1 hour, < 1 day
     
     async def _optimize_for_tokens(self, chunks: List[DocumentChunk]) -> List[DocumentChunk]:
         """Optimize chunk selection to fit within token limits"""
@@ -372,7 +837,8 @@ class ContextManager:
                     # Create truncated chunk
                     truncated_content = self._truncate_content(
                         chunk.content, 
-                        remaining_tokens
+                        remaining_tokens,
+                        self._get_token_ids(chunk)
                     )
                     
                     truncated_chunk = DocumentChunk(
@@ -389,14 +855,20 @@ class ContextManager:
         
         return optimized_chunks
     
-    def _truncate_content(self, content: str, max_tokens: int) -> str:
+    def _get_token_ids(self, chunk: DocumentChunk) -> np.ndarray:
+        """Token ids of a chunk's content, encoded once and then reused"""
+        if chunk.token_ids is None:
+            chunk.token_ids = np.asarray(self.tokenizer.encode(chunk.content), dtype=np.int32)
+        return chunk.token_ids
+    
+    def _truncate_content(self, content: str, max_tokens: int, token_ids: Optional[Sequence[int]] = None) -> str:
         """Intelligently truncate content to fit token limit"""
-        tokens = self.tokenizer.encode(content)
+        tokens = token_ids if token_ids is not None else self.tokenizer.encode(content)
         if len(tokens) <= max_tokens:
             return content
         
         # Truncate and decode
-        truncated_tokens = tokens[:max_tokens]
+        truncated_tokens = np.asarray(tokens[:max_tokens]).tolist()
         truncated_content = self.tokenizer.decode(truncated_tokens)
         
         # Try to end at a natural break point
@@ -415,22 +887,15 @@ class ContextManager:
         if not chunks:
             return
         
-        conn = sqlite3.connect(self.db_path)
-        
-        for chunk in chunks:
-            if chunk.last_accessed:
-                conn.execute("""
-                    UPDATE chunks 
-                    SET last_accessed = ?, relevance_score = ?
-                    WHERE id = ?
-                """, (
-                    chunk.last_accessed.isoformat(),
-                    chunk.relevance_score,
-                    chunk.id.replace('_truncated', '')  # Handle truncated chunks
-                ))
-        
-        conn.commit()
-        conn.close()
+        await self._run_db(self._db_executemany, _SQL_UPDATE_ACCESS, [
+            (
+                chunk.last_accessed,
+                chunk.relevance_score,
+                chunk.id.replace('_truncated', '')  # Handle truncated chunks
+            )
+            for chunk in chunks
+            if chunk.last_accessed is not None
+        ])
     
     async def search_chunks(
         self, 
@@ -439,22 +904,18 @@ class ContextManager:
         limit: int = 5
     ) -> List[DocumentChunk]:
         """Search for specific chunks by content"""
-        query_embedding = self.embedder.encode(query)
+        query_embedding = await self._embed_query(query)
         
-        candidates = self.chunks
-        if category:
-            candidates = [c for c in self.chunks if c.category == category]
+        matrix, embedded = self._get_embedding_matrix()
+        if matrix is None:
+            return []
         
-        scored_chunks = []
-        for chunk in candidates:
-            if chunk.embedding is None:
-                continue
-            
-            score = np.dot(query_embedding, chunk.embedding)
-            scored_chunks.append((score, chunk))
-        
-        scored_chunks.sort(key=lambda x: x[0], reverse=True)
-        return [chunk for _, chunk in scored_chunks[:limit]]
+        scores = matrix @ np.asarray(query_embedding, dtype=np.float32)
+        ranked = [
+            embedded[i] for i in np.argsort(-scores, kind='stable')
+            if not category or embedded[i].category == category
+        ]
+        return ranked[:limit]
     
     async def get_stats(self) -> Dict[str, Any]:
         """Get context manager statistics"""
@@ -479,13 +940,11 @@ class ContextManager:
         """Perform health check on context manager"""
         try:
             # Test database connection
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.execute("SELECT COUNT(*) FROM chunks")
-            chunk_count = cursor.fetchone()[0]
-            conn.close()
+            rows = await self._run_db(self._db_fetchall, _SQL_COUNT_CHUNKS)
+            chunk_count = rows[0][0]
             
             # Test embedding model
-            test_embedding = self.embedder.encode("test")
+            test_embedding = await self._encode("test")
             
             return {
                 'status': 'healthy',
@@ -502,10 +961,19 @@ class ContextManager:
     
     async def cleanup(self) -> None:
         """Cleanup resources"""
-        # Save any pending changes
-        if self.chunks:
-            for chunk in self.chunks:
-                if chunk.last_accessed:
-                    await self._save_chunk(chunk)
+        # Save any pending changes in one transaction
+        await self._save_chunks([chunk for chunk in self.chunks if chunk.last_accessed is not None])
+        
+        if self._embed_executor is not None:
+            self._embed_executor.shutdown(wait=True, cancel_futures=True)
+            self._embed_executor = None
+        
+        if self._db_executor is not None:
+            self._db_executor.shutdown(wait=True)
+            self._db_executor = None
+        
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
         
-        self.logger.info("🧹 Context manager cleanup complete")
\ No newline at end of file
+        self.logger.info("🧹 Context manager cleanup complete")
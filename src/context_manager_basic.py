@@ -6,16 +6,43 @@ Simplified version without ML dependencies for testing.
 
 import asyncio
 import hashlib
+import heapq
 import json
 import logging
 import sqlite3
-from dataclasses import dataclass, asdict
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict, field
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set, Tuple
 
+# Common stop words to filter out of keyword sets
+STOP_WORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from',
+    'has', 'he', 'in', 'is', 'it', 'its', 'of', 'on', 'that', 'the',
+    'to', 'was', 'were', 'will', 'with', 'can', 'how', 'what', 'when',
+    'where', 'why', 'i', 'you', 'me', 'my', 'your', 'this'
+})
 
-@dataclass
+# Punctuation stripped from both ends of each word
+KEYWORD_PUNCTUATION = '.,!?()[]{}";:'
+
+# Default category priorities, applied whenever a query analysis is given
+CATEGORY_PRIORITIES = {
+    'api': 0.3,
+    'javascript': 0.2,
+    'mcp': 0.4,
+    'formulas': 0.1,
+    'apps': 0.1
+}
+
+# Recency boost windows
+ONE_HOUR = timedelta(hours=1)
+ONE_DAY = timedelta(days=1)
+
+
+@dataclass(slots=True)
 class DocumentChunk:
     """Represents a chunk of documentation with metadata"""
     id: str
@@ -25,6 +52,8 @@ class DocumentChunk:
     tokens: int
     relevance_score: float = 0.0
     last_accessed: Optional[datetime] = None
+    # Content + title keywords, computed once; derived data kept out of repr/eq
+    keywords: Optional[FrozenSet[str]] = field(default=None, repr=False, compare=False)
 
 
 class ContextManagerBasic:
@@ -33,7 +62,7 @@ class ContextManagerBasic:
     Uses keyword matching instead of semantic search.
     """
     
-    def __init__(self, max_tokens: int = 128000, cache_dir: str = ".cache"):
+    def __init__(self, max_tokens: int = 128000, cache_dir: str = ".cache", query_cache_size: int = 256):
         self.max_tokens = max_tokens
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
@@ -44,9 +73,21 @@ class ContextManagerBasic:
         self.chunks: List[DocumentChunk] = []
         self.chunk_index: Dict[str, DocumentChunk] = {}
         
+        # Inverted indexes over self.chunks positions
+        self._postings: Dict[str, List[int]] = {}
+        self._category_postings: Dict[str, List[int]] = {}
+        self._accessed: Set[int] = set()
+        
+        # LRU of query keywords -> keyword scores of matching chunk positions
+        self._query_cache: "OrderedDict[FrozenSet[str], Dict[int, float]]" = OrderedDict()
+        self.query_cache_size = query_cache_size
+        
         # Database for persistent storage
         self.db_path = self.cache_dir / "context.db"
+        # One long-lived connection in autocommit mode: bulk writes open their own transaction
+        self._conn = self._connect(check_same_thread=False, isolation_level=None)
         self._init_database()
+        self._db_executor: Optional[ThreadPoolExecutor] = None
         
         # Performance tracking
         self.stats = {
@@ -56,9 +97,34 @@ class ContextManagerBasic:
             'context_optimizations': 0
         }
     
+    def _connect(self, **kwargs: Any) -> sqlite3.Connection:
+        """Open a database connection with the write-friendly pragmas applied"""
+        conn = sqlite3.connect(self.db_path, **kwargs)
+        # WAL with relaxed sync: no fsync per commit, readers never block the writer
+        for pragma in (
+            "journal_mode=WAL",
+            "synchronous=NORMAL",
+            "temp_store=MEMORY",
+            "cache_size=-65536"  # 64 MB
+        ):
+            conn.execute(f"PRAGMA {pragma}")
+        return conn
+    
+    async def _run_db(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking DB call on the dedicated DB thread so the event loop stays free"""
+        if self._db_executor is None:
+            # One thread serializes access to the shared connection
+            self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="context-db")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._db_executor, func, *args)
+    
+    def _fetchall(self, sql: str) -> List[Tuple[Any, ...]]:
+        """Run a query and return all rows"""
+        return self._conn.execute(sql).fetchall()
+    
     def _init_database(self) -> None:
         """Initialize SQLite database for chunk storage"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conn
         conn.execute("""
             CREATE TABLE IF NOT EXISTS chunks (
                 id TEXT PRIMARY KEY,
@@ -67,7 +133,7 @@ class ContextManagerBasic:
                 category TEXT NOT NULL,
                 tokens INTEGER NOT NULL,
                 relevance_score REAL DEFAULT 0.0,
-                last_accessed TIMESTAMP,
+                last_accessed INTEGER,  -- Unix seconds
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
@@ -77,12 +143,10 @@ class ContextManagerBasic:
         conn.execute("""
             CREATE INDEX IF NOT EXISTS idx_relevance ON chunks (relevance_score DESC)
         """)
-        conn.commit()
-        conn.close()
     
     def _estimate_tokens(self, text: str) -> int:
         """Rough token estimation without tiktoken"""
-        return len(text.split()) * 1.3  # Rough approximation
+        return len(text.split()) * 13 // 10  # ~1.3 tokens per word
     
     async def initialize(self) -> None:
         """Initialize the context manager with all documentation"""
@@ -95,37 +159,68 @@ class ContextManagerBasic:
         if not self.chunks:
             await self._process_documentation()
         
+        self._build_index()
+        
         self.logger.info(f"✅ Context manager initialized with {len(self.chunks)} chunks")
     
+    def _build_index(self) -> None:
+        """Map keywords and categories to the chunks containing them"""
+        postings = defaultdict(list)
+        category_postings = defaultdict(list)
+        
+        for i, chunk in enumerate(self.chunks):
+            if chunk.keywords is None:
+                chunk.keywords = self._chunk_keywords(chunk.content, chunk.title)
+            for keyword in chunk.keywords:
+                postings[keyword].append(i)
+            category_postings[chunk.category].append(i)
+        
+        self._postings = dict(postings)
+        self._category_postings = dict(category_postings)
+        self._accessed = {i for i, chunk in enumerate(self.chunks) if chunk.last_accessed}
+        self._query_cache.clear()
+    
     async def _load_chunks_from_db(self) -> None:
         """Load chunks from persistent storage"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.execute("""
+        chunks = await self._run_db(self._read_chunks)
+        
+        self.chunks.extend(chunks)
+        self.chunk_index.update((chunk.id, chunk) for chunk in chunks)
+        
+        self.stats['total_chunks'] = len(self.chunks)
+        
+        if self.chunks:
+            self.logger.info(f"📚 Loaded {len(self.chunks)} chunks from cache")
+    
+    def _read_chunks(self) -> List[DocumentChunk]:
+        """Build chunks straight from the cursor, without materializing the rows first"""
+        cursor = self._conn.execute("""
             SELECT id, content, title, category, tokens, relevance_score, last_accessed
             FROM chunks
         """)
         
-        for row in cursor.fetchall():
-            last_accessed = datetime.fromisoformat(row[6]) if row[6] else None
-            
-            chunk = DocumentChunk(
+        return [
+            DocumentChunk(
                 id=row[0],
                 content=row[1],
                 title=row[2],
                 category=row[3],
                 tokens=row[4],
                 relevance_score=row[5],
-                last_accessed=last_accessed
+                last_accessed=self._parse_last_accessed(row[6]),
+                keywords=self._chunk_keywords(row[1], row[2])
             )
-            
-            self.chunks.append(chunk)
-            self.chunk_index[chunk.id] = chunk
-        
-        conn.close()
-        self.stats['total_chunks'] = len(self.chunks)
-        
-        if self.chunks:
-            self.logger.info(f"📚 Loaded {len(self.chunks)} chunks from cache")
+            for row in cursor
+        ]
+    
+    @staticmethod
+    def _parse_last_accessed(value: Any) -> Optional[datetime]:
+        """Convert a stored access time (Unix seconds) back to a datetime"""
+        if not value:
+            return None
+        if isinstance(value, str):  # ISO timestamps from older databases
+            return datetime.fromisoformat(value)
+        return datetime.fromtimestamp(value)
     
     async def _process_documentation(self) -> None:
         """Process all documentation files into chunks"""
@@ -156,27 +251,31 @@ class ContextManagerBasic:
         chunks = self._smart_chunking(content, file_path.stem)
         
         # Process each chunk
+        new_chunks = []
         for chunk_content, title in chunks:
-            chunk_id = hashlib.sha256(
-                (chunk_content + title + category).encode()
-            ).hexdigest()[:16]
+            # 16 hex chars; a cache key, so no need for SHA-256
+            chunk_id = hashlib.blake2b(
+                (chunk_content + title + category).encode(), digest_size=8
+            ).hexdigest()
             
-            tokens = int(self._estimate_tokens(chunk_content))
+            tokens = self._estimate_tokens(chunk_content)
             
             chunk = DocumentChunk(
                 id=chunk_id,
                 content=chunk_content,
                 title=title,
                 category=category,
-                tokens=tokens
+                tokens=tokens,
+                keywords=self._chunk_keywords(chunk_content, title)
             )
             
-            # Save to database
-            await self._save_chunk(chunk)
-            
+            new_chunks.append(chunk)
             self.chunks.append(chunk)
             self.chunk_index[chunk_id] = chunk
         
+        # Save to database
+        await self._save_chunks_bulk(new_chunks)
+        
         self.stats['total_chunks'] = len(self.chunks)
         self.logger.info(f"✅ Processed {file_path.name}: {len(chunks)} chunks")
     
@@ -219,26 +318,34 @@ class ContextManagerBasic:
         
         return chunks
     
-    async def _save_chunk(self, chunk: DocumentChunk) -> None:
-        """Save chunk to persistent storage"""
-        conn = sqlite3.connect(self.db_path)
+    async def _save_chunks_bulk(self, chunks: List[DocumentChunk]) -> None:
+        """Save chunks to persistent storage in a single transaction"""
+        if not chunks:
+            return
         
-        conn.execute("""
+        await self._run_db(self._executemany, """
             INSERT OR REPLACE INTO chunks
             (id, content, title, category, tokens, relevance_score, last_accessed)
             VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
+        """, [(
             chunk.id,
             chunk.content,
             chunk.title,
             chunk.category,
             chunk.tokens,
             chunk.relevance_score,
-            chunk.last_accessed.isoformat() if chunk.last_accessed else None
-        ))
-        
-        conn.commit()
-        conn.close()
+            int(chunk.last_accessed.timestamp()) if chunk.last_accessed else None
+        ) for chunk in chunks])
+    
+    def _executemany(self, sql: str, rows: List[Tuple[Any, ...]]) -> None:
+        """Run a statement for every row in one transaction"""
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany(sql, rows)
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
     
     async def get_relevant_context(
         self,
@@ -250,22 +357,37 @@ class ContextManagerBasic:
         """Get the most relevant context chunks for a query using keyword matching"""
         
         # Convert query to keywords
-        query_keywords = self._extract_keywords(query.lower())
+        query_keywords = frozenset(self._extract_keywords(query))
+        keyword_scores = self._get_keyword_scores(query_keywords)
+        
+        # Only chunks with a keyword match, a category boost or a recency boost can score
+        category_boosts = {
+            category: self._get_category_boost(category, analysis)
+            for category in self._category_postings
+        }
+        candidates = self._accessed.union(keyword_scores)
+        for category, rows in self._category_postings.items():
+            if category_boosts[category] > 0:
+                candidates.update(rows)
         
         # Score chunks based on keyword matches
         relevant_chunks = []
+        now = datetime.now()
         
-        for chunk in self.chunks:
-            score = self._calculate_keyword_score(chunk, query_keywords, analysis)
+        for i in sorted(candidates):
+            chunk = self.chunks[i]
+            score = self._calculate_keyword_score(
+                chunk, keyword_scores.get(i, 0.0), category_boosts[chunk.category], now
+            )
             
             if score > 0:
                 chunk.relevance_score = score
-                chunk.last_accessed = datetime.now()
+                chunk.last_accessed = now
+                self._accessed.add(i)
                 relevant_chunks.append(chunk)
         
-        # Sort by relevance and select top chunks
-        relevant_chunks.sort(key=lambda x: x.relevance_score, reverse=True)
-        selected_chunks = relevant_chunks[:max_chunks]
+        # Select top chunks by relevance (ties keep document order)
+        selected_chunks = heapq.nlargest(max_chunks, relevant_chunks, key=lambda x: x.relevance_score)
         
         # Optimize for token limit
         optimized_chunks = await self._optimize_for_tokens(selected_chunks)
@@ -275,48 +397,53 @@ class ContextManagerBasic:
         
         self.stats['context_optimizations'] += 1
         
-        self.logger.debug(f"🎯 Selected {len(optimized_chunks)} context chunks for query")
+        self.logger.debug("🎯 Selected %d context chunks for query", len(optimized_chunks))
         return optimized_chunks
     
     def _extract_keywords(self, text: str) -> Set[str]:
-        """Extract keywords from text"""
-        # Common stop words to filter out
-        stop_words = {
-            'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from',
-            'has', 'he', 'in', 'is', 'it', 'its', 'of', 'on', 'that', 'the',
-            'to', 'was', 'were', 'will', 'with', 'can', 'how', 'what', 'when',
-            'where', 'why', 'i', 'you', 'me', 'my', 'your', 'this', 'that'
-        }
-        
-        # Extract words and filter
-        words = set()
-        for word in text.split():
-            word = word.strip('.,!?()[]{}";:').lower()
-            if word and len(word) > 2 and word not in stop_words:
-                words.add(word)
-        
-        return words
+        """Extract lowercased keywords from text"""
+        words = {word.strip(KEYWORD_PUNCTUATION) for word in text.lower().split()}
+        return {word for word in words if len(word) > 2 and word not in STOP_WORDS}
+    
+    def _chunk_keywords(self, content: str, title: str) -> FrozenSet[str]:
+        """Keywords of a chunk's content and title"""
+        return frozenset(self._extract_keywords(content + ' ' + title))
+    
+    def _get_keyword_scores(self, query_keywords: FrozenSet[str]) -> Dict[int, float]:
+        """Keyword overlap of every matching chunk position, memoized per keyword set"""
+        scores = self._query_cache.get(query_keywords)
+        if scores is not None:
+            self._query_cache.move_to_end(query_keywords)
+            self.stats['cache_hits'] += 1
+            return scores
+        
+        self.stats['cache_misses'] += 1
+        
+        # Count matched keywords per chunk from the postings
+        matches = defaultdict(int)
+        for keyword in query_keywords:
+            for i in self._postings.get(keyword, ()):
+                matches[i] += 1
+        
+        denominator = max(len(query_keywords), 1)
+        scores = {i: count / denominator for i, count in matches.items()}
+        
+        self._query_cache[query_keywords] = scores
+        if len(self._query_cache) > self.query_cache_size:
+            self._query_cache.popitem(last=False)
+        return scores
     
     def _calculate_keyword_score(
         self, 
         chunk: DocumentChunk, 
-        query_keywords: Set[str],
-        analysis: Optional[Dict[str, Any]] = None
+        keyword_score: float,
+        category_boost: float,
+        now: datetime
     ) -> float:
-        """Calculate relevance score based on keyword matching"""
-        
-        chunk_text = (chunk.content + ' ' + chunk.title).lower()
-        chunk_keywords = self._extract_keywords(chunk_text)
-        
-        # Calculate keyword overlap
-        matches = query_keywords.intersection(chunk_keywords)
-        keyword_score = len(matches) / max(len(query_keywords), 1)
-        
-        # Category boost based on analysis
-        category_boost = self._get_category_boost(chunk.category, analysis)
+        """Combine a chunk's keyword overlap with its category and recency boosts"""
         
         # Recency boost
-        recency_boost = self._get_recency_boost(chunk)
+        recency_boost = self._get_recency_boost(chunk, now)
         
         return keyword_score + category_boost + recency_boost
     
@@ -325,26 +452,17 @@ class ContextManagerBasic:
         if not analysis:
             return 0.0
         
-        # Default category priorities
-        category_priorities = {
-            'api': 0.3,
-            'javascript': 0.2,
-            'mcp': 0.4,
-            'formulas': 0.1,
-            'apps': 0.1
-        }
-        
-        return category_priorities.get(category, 0.0)
+        return CATEGORY_PRIORITIES.get(category, 0.0)
     
-    def _get_recency_boost(self, chunk: DocumentChunk) -> float:
+    def _get_recency_boost(self, chunk: DocumentChunk, now: datetime) -> float:
         """Calculate recency boost for recently accessed chunks"""
         if not chunk.last_accessed:
             return 0.0
         
-        time_diff = datetime.now() - chunk.last_accessed
-        if time_diff < timedelta(hours=1):
+        time_diff = now - chunk.last_accessed
+        if time_diff < ONE_HOUR:
             return 0.2
-        elif time_diff < timedelta(days=1):
+        elif time_diff < ONE_DAY:
             return 0.1
         else:
             return 0.0
@@ -370,22 +488,15 @@ class ContextManagerBasic:
         if not chunks:
             return
         
-        conn = sqlite3.connect(self.db_path)
-        
-        for chunk in chunks:
-            if chunk.last_accessed:
-                conn.execute("""
-                    UPDATE chunks 
-                    SET last_accessed = ?, relevance_score = ?
-                    WHERE id = ?
-                """, (
-                    chunk.last_accessed.isoformat(),
-                    chunk.relevance_score,
-                    chunk.id
-                ))
-        
-        conn.commit()
-        conn.close()
+        await self._run_db(self._executemany, """
+            UPDATE chunks
+            SET last_accessed = ?, relevance_score = ?
+            WHERE id = ?
+        """, [(
+            int(chunk.last_accessed.timestamp()),
+            chunk.relevance_score,
+            chunk.id
+        ) for chunk in chunks if chunk.last_accessed])
     
     async def get_stats(self) -> Dict[str, Any]:
         """Get context manager statistics"""
@@ -408,10 +519,8 @@ class ContextManagerBasic:
         """Perform health check on context manager"""
         try:
             # Test database connection
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.execute("SELECT COUNT(*) FROM chunks")
-            chunk_count = cursor.fetchone()[0]
-            conn.close()
+            rows = await self._run_db(self._fetchall, "SELECT COUNT(*) FROM chunks")
+            chunk_count = rows[0][0]
             
             return {
                 'status': 'healthy',
@@ -427,4 +536,9 @@ class ContextManagerBasic:
     
     async def cleanup(self) -> None:
         """Cleanup resources"""
+        if self._db_executor is not None:
+            self._db_executor.shutdown(wait=True)
+            self._db_executor = None
+        
+        self._conn.close()
         self.logger.info("🧹 Context manager cleanup complete")
\ No newline at end of file
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+⚙️ Query analysis kernels for Airtable AI Agent
+Pure functions over precompiled patterns, kept free of agent state so the
+hot path can be compiled (e.g. Cython pure-Python mode) as-is.
+"""
+
+import bisect
+import re
+import sys
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, Sequence, Set, Tuple
+
+# Words that hint at conditional logic (matched as substrings)
+CONDITIONAL_WORDS = ('if', 'when', 'where', 'unless', 'provided', 'given')
+
+# Complexity score thresholds between simple / medium / complex
+COMPLEXITY_THRESHOLDS = (1.0, 2.5)
+
+
+def is_word_char(ch: str) -> bool:
+    """Match re's \\w for str patterns"""
+    return ch.isalnum() or ch == '_'
+
+
+def find_record_ids(text: str) -> List[str]:
+    """Find Airtable record IDs; equivalent to findall(r'\\brec[a-zA-Z0-9]{14}\\b')"""
+    found = []
+    end = len(text) - 17
+    i = text.find('rec')
+    while 0 <= i <= end:
+        token = text[i:i + 17]
+        body = token[3:]
+        if (body.isascii() and body.isalnum()
+                and (i == 0 or not is_word_char(text[i - 1]))
+                and (i == end or not is_word_char(text[i + 17]))):
+            found.append(token)
+            i = text.find('rec', i + 17)
+        else:
+            i = text.find('rec', i + 1)
+    return found
+
+
+def score_intents(
+    text: str,
+    matchers: Sequence[Tuple[Hashable, re.Pattern, Sequence[re.Pattern]]],
+    candidates: Optional[Set[Hashable]] = None
+) -> Tuple[Optional[Hashable], int]:
+    """
+    Return the highest scoring intent and its score.
+
+    Each matcher is an (intent, presence gate, patterns) triple; the score is the
+    number of non-overlapping matches summed over the patterns. When
+    ``candidates`` is given it replaces the gates. Ties go to the earliest
+    intent. Every candidate must be scored: scores are unbounded, so stopping
+    once one intent reaches the confidence cap could pick the wrong winner.
+    """
+    best_intent, max_score = None, 0
+
+    for intent, gate, patterns in matchers:
+        if candidates is not None:
+            if intent not in candidates:
+                continue
+        elif not gate.search(text):
+            continue
+
+        score = 0
+        for pattern in patterns:
+            score += len(pattern.findall(text))
+
+        if score > max_score:
+            best_intent, max_score = intent, score
+
+    return best_intent, max_score
+
+
+def extract_entities(
+    query: str,
+    query_lower: Optional[str],
+    patterns: Mapping[str, Sequence[re.Pattern]],
+    keywords: Mapping[str, Sequence[str]],
+    scanners: Mapping[str, Callable[[str], List[Any]]]
+) -> Dict[str, List[str]]:
+    """
+    Extract cleaned, deduplicated entity names by type.
+
+    Entity types whose keywords are missing from ``query_lower`` are skipped;
+    pass None to disable that gate. Types with a scanner use it instead of
+    their patterns.
+    """
+    entities = {}
+
+    for entity_type, type_patterns in patterns.items():
+        type_keywords = keywords.get(entity_type)
+        if query_lower is not None and type_keywords and not any(k in query_lower for k in type_keywords):
+            continue
+
+        # Clean and deduplicate matches, keeping first-seen order
+        seen = set()
+        cleaned_matches = []
+        scanner = scanners.get(entity_type)
+        found = [scanner(query)] if scanner else (pattern.findall(query) for pattern in type_patterns)
+        for matches in found:
+            for match in matches:
+                if isinstance(match, tuple):
+                    match = match[0]  # Take first group if tuple
+
+                match = sys.intern(match.strip().strip('"\','))
+                if match and match not in seen:
+                    seen.add(match)
+                    cleaned_matches.append(match)
+
+        if cleaned_matches:
+            entities[entity_type] = cleaned_matches
+
+    return entities
+
+
+def complexity_code(complex_intent: bool, total_entities: int, word_count: int, conditional_hits: int) -> int:
+    """Score query features and return 0 (simple), 1 (medium) or 2 (complex)"""
+    complexity_score = 2 * complex_intent
+    complexity_score += min(total_entities / 3, 2)  # Cap entity contribution
+
+    # Longer queries are more complex
+    complexity_score += 1 if word_count > 20 else 0.5 if word_count > 10 else 0
+
+    complexity_score += 0.5 * conditional_hits
+    return bisect.bisect_right(COMPLEXITY_THRESHOLDS, complexity_score)
+
+
+def count_conditional_words(query_lower: str) -> int:
+    """Count distinct conditional words in a lowercased query"""
+    return sum(word in query_lower for word in CONDITIONAL_WORDS)
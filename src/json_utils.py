@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+⚡ JSON helpers for Airtable AI Agent
+Fast serialization via orjson when installed, with a stdlib fallback.
+"""
+
+import json
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime, timezone
+from enum import Enum
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Serialize types the JSON encoders don't handle natively"""
+    if isinstance(obj, datetime) and obj.tzinfo is None:
+        return obj.replace(tzinfo=timezone.utc).isoformat()  # Match OPT_NAIVE_UTC
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return asdict(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, 'tolist'):  # numpy arrays and scalars
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _INDENT_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """Serialize to compact UTF-8 JSON bytes"""
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    def dumps(obj: Any, indent: bool = False) -> str:
+        """Serialize to a JSON string, optionally pretty-printed"""
+        if indent:
+            return orjson.dumps(obj, default=_default, option=_INDENT_OPTIONS).decode()
+        return dumps_bytes(obj).decode()
+
+    def loads(data: Union[str, bytes]) -> Any:
+        """Parse JSON text or bytes"""
+        return orjson.loads(data)
+
+else:
+    def dumps_bytes(obj: Any) -> bytes:
+        """Serialize to compact UTF-8 JSON bytes"""
+        return json.dumps(obj, default=_default, separators=(',', ':')).encode()
+
+    def dumps(obj: Any, indent: bool = False) -> str:
+        """Serialize to a JSON string, optionally pretty-printed"""
+        if indent:
+            return json.dumps(obj, default=_default, indent=2)
+        return json.dumps(obj, default=_default, separators=(',', ':'))
+
+    def loads(data: Union[str, bytes]) -> Any:
+        """Parse JSON text or bytes"""
+        return json.loads(data)
@@ -5,24 +5,146 @@ Perfect integration with our comprehensive airtable-mcp server.
 """
 
 import asyncio
+import copy
 import json
 import logging
+import statistics
+import time
+from collections import deque
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Union
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Set, Tuple, Union
 import aiohttp
 from datetime import datetime, timezone
 
+from .json_utils import dumps, dumps_bytes, loads
+
+
+# Category of every tool the MCP server provides
+TOOL_CATEGORIES: Mapping[str, str] = MappingProxyType({
+    # Data Operations
+    'list_tables': 'data',
+    'list_records': 'data',
+    'get_record': 'data',
+    'create_record': 'data',
+    'update_record': 'data',
+    'delete_record': 'data',
+    'search_records': 'data',
+
+    # Webhook Management
+    'list_webhooks': 'webhooks',
+    'create_webhook': 'webhooks',
+    'delete_webhook': 'webhooks',
+    'get_webhook_payloads': 'webhooks',
+    'refresh_webhook': 'webhooks',
+
+    # Schema Discovery
+    'list_bases': 'schema',
+    'get_base_schema': 'schema',
+    'describe_table': 'schema',
+    'list_field_types': 'schema',
+    'get_table_views': 'schema',
+
+    # Table Management
+    'create_table': 'tables',
+    'update_table': 'tables',
+    'delete_table': 'tables',
+
+    # Field Management
+    'create_field': 'fields',
+    'update_field': 'fields',
+    'delete_field': 'fields',
+
+    # Batch Operations
+    'batch_create_records': 'batch',
+    'batch_update_records': 'batch',
+    'batch_delete_records': 'batch',
+    'batch_upsert_records': 'batch',
+
+    # Attachment Management
+    'upload_attachment': 'attachments',
+
+    # Advanced Views
+    'create_view': 'views',
+    'get_view_metadata': 'views',
+
+    # Base Management
+    'create_base': 'bases',
+    'list_collaborators': 'bases',
+    'list_shares': 'bases'
+})
+
+# Names accepted by execute_tool and bulk_operation
+VALID_TOOLS = frozenset(TOOL_CATEGORIES)
+
+# Number of distinct tool categories
+TOOL_CATEGORY_COUNT = len(set(TOOL_CATEGORIES.values()))
+
+# Tools that modify data or schema in Airtable
+WRITE_TOOLS = frozenset({
+    'create_record', 'update_record', 'delete_record',
+    'create_webhook', 'delete_webhook', 'refresh_webhook',
+    'create_table', 'update_table', 'delete_table',
+    'create_field', 'update_field', 'delete_field',
+    'batch_create_records', 'batch_update_records',
+    'batch_delete_records', 'batch_upsert_records',
+    'upload_attachment', 'create_view', 'create_base'
+})
+
+# Tools that change the base schema, invalidating cached schema responses
+SCHEMA_WRITE_TOOLS = frozenset({
+    'create_table', 'update_table', 'delete_table',
+    'create_field', 'update_field', 'delete_field',
+    'create_view', 'create_base'
+})
+
+# Read-only schema tools whose successful results are cached
+CACHED_SCHEMA_TOOLS = frozenset({'get_base_schema'})
+
+# Seconds tools/list and base schema responses stay cached
+SCHEMA_CACHE_TTL = 60.0
+
+# Responses larger than this are decoded in a worker thread
+LARGE_RESPONSE_BYTES = 256 * 1024
+
+# Number of recent requests the response-time stats cover
+RESPONSE_TIME_WINDOW = 256
+
+# Connection pool for sessions the client creates itself
+HTTP_POOL_SIZE = 100
+HTTP_KEEPALIVE_SECONDS = 75
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=30, sock_connect=5)
+
+# Headers sent with every JSON-RPC request
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# Airtable accepts at most this many records per batch request
+RECORD_BATCH_LIMIT = 10
+
+# Single-record writes coalesced into batch calls: tool -> (batch tool, batch parameter)
+RECORD_BATCH_TOOLS: Mapping[str, Tuple[str, str]] = MappingProxyType({
+    'create_record': ('batch_create_records', 'records'),
+    'update_record': ('batch_update_records', 'records'),
+    'delete_record': ('batch_delete_records', 'recordIds')
+})
+
 
 class MCPError(Exception):
     """Exception raised for MCP-related errors"""
+    __slots__ = ("message", "code", "data")
+    
     def __init__(self, message: str, code: int = -32603, data: Optional[Dict] = None):
         self.message = message
         self.code = code
         self.data = data
         super().__init__(self.message)
+    
+    def __reduce__(self):
+        # Slot values aren't part of the default exception pickle state
+        return type(self), (self.message, self.code, self.data)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MCPTool:
     """Represents an MCP tool with its metadata"""
     name: str
@@ -31,6 +153,112 @@ class MCPTool:
     category: str = "general"
 
 
+# Fallback tool list for servers without tools/list, built once
+KNOWN_TOOLS: Tuple[MCPTool, ...] = tuple(
+    MCPTool(
+        name=tool_name,
+        description=f"{tool_name.replace('_', ' ').title()} operation",
+        parameters={},
+        category=category
+    )
+    for tool_name, category in TOOL_CATEGORIES.items()
+)
+
+
+def _split_batch_result(result: Any, size: int) -> Optional[List[Any]]:
+    """Per-record results of a batch write, or None if the reply can't be split"""
+    if not isinstance(result, dict):
+        return None
+    
+    records = result.get('records')
+    if isinstance(records, list):
+        return records if len(records) == size else None
+    
+    # MCP servers answer with text content, which batch tools fill with the records as JSON
+    content = result.get('content')
+    if not isinstance(content, list) or len(content) != 1 or not isinstance(content[0], dict):
+        return None
+    try:
+        payload = loads(content[0].get('text', ''))
+    except (TypeError, ValueError):
+        return None
+    if isinstance(payload, dict):
+        payload = payload.get('records')
+    if not isinstance(payload, list) or len(payload) != size:
+        return None
+    # Shaped like the reply to the single-record tool
+    return [{'content': [{**content[0], 'text': dumps(record)}]} for record in payload]
+
+
+class _RecordBatcher:
+    """Buffers single-record writes for one (table, tool) and sends them as batch calls"""
+    
+    def __init__(self, tool_name: str, send: Callable[[List[Any]], Awaitable[Dict[str, Any]]], window: float):
+        self._tool_name = tool_name
+        self._send = send
+        self._window = window
+        # Cleared once a batch reply can't be split per record; callers then write directly
+        self.coalescing = True
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+    
+    async def submit(self, item: Any) -> Dict[str, Any]:
+        """Queue one item and wait for the result of the batch that carries it"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        
+        if len(self._pending) >= RECORD_BATCH_LIMIT:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window, self._flush)
+        
+        return await future
+    
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            response = await self._send([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        # Each caller gets only its own record, under the single-record tool name
+        results = _split_batch_result(response.get('result'), len(batch))
+        if response['success'] and results is None:
+            # Never hand callers each other's records; stop batching this tool instead
+            logging.getLogger("mcp_client").warning(
+                "%s batch reply can't be split per record; sending further writes individually",
+                self._tool_name
+            )
+            self.coalescing = False
+        for index, (_, future) in enumerate(batch):
+            if not future.done():
+                own = dict(response, tool=self._tool_name, batch={'index': index, 'size': len(batch)})
+                if 'result' in own:
+                    own['result'] = results[index] if results is not None else None
+                future.set_result(own)
+    
+    async def drain(self) -> None:
+        """Send anything still buffered and wait for in-flight batches"""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
 class MCPClient:
     """
     Client for interacting with the Airtable MCP Server.
@@ -38,74 +266,45 @@ class MCPClient:
     Provides seamless integration with all 33 tools in our comprehensive MCP server.
     """
     
-    def __init__(self, server_url: str = "http://localhost:8010/mcp"):
+    def __init__(
+        self,
+        server_url: str = "http://localhost:8010/mcp",
+        session: Optional[aiohttp.ClientSession] = None,
+        record_batch_window: Optional[float] = None
+    ):
         self.server_url = server_url
-        self.session: Optional[aiohttp.ClientSession] = None
+        self.session: Optional[aiohttp.ClientSession] = session
+        self._owns_session = session is None
         self.logger = logging.getLogger("mcp_client")
         self.request_id = 0
+        self._batch_supported = True  # Cleared once the server answers a batch with a single response
+        self._server_reachable: Optional[bool] = None  # False after a refused connection, until a request gets through
         
-        # Tool categories mapping
-        self.tool_categories = {
-            # Data Operations
-            'list_tables': 'data',
-            'list_records': 'data',
-            'get_record': 'data', 
-            'create_record': 'data',
-            'update_record': 'data',
-            'delete_record': 'data',
-            'search_records': 'data',
-            
-            # Webhook Management
-            'list_webhooks': 'webhooks',
-            'create_webhook': 'webhooks',
-            'delete_webhook': 'webhooks', 
-            'get_webhook_payloads': 'webhooks',
-            'refresh_webhook': 'webhooks',
-            
-            # Schema Discovery
-            'list_bases': 'schema',
-            'get_base_schema': 'schema',
-            'describe_table': 'schema',
-            'list_field_types': 'schema',
-            'get_table_views': 'schema',
-            
-            # Table Management  
-            'create_table': 'tables',
-            'update_table': 'tables',
-            'delete_table': 'tables',
-            
-            # Field Management
-            'create_field': 'fields',
-            'update_field': 'fields', 
-            'delete_field': 'fields',
-            
-            # Batch Operations
-            'batch_create_records': 'batch',
-            'batch_update_records': 'batch',
-            'batch_delete_records': 'batch',
-            'batch_upsert_records': 'batch',
-            
-            # Attachment Management
-            'upload_attachment': 'attachments',
-            
-            # Advanced Views
-            'create_view': 'views',
-            'get_view_metadata': 'views',
-            
-            # Base Management
-            'create_base': 'bases',
-            'list_collaborators': 'bases',
-            'list_shares': 'bases'
-        }
+        # Cached tools/list and schema responses: key -> (expiry, value)
+        self._schema_cache: Dict[str, Tuple[float, Any]] = {}
+        
+        # Read-only tool calls in flight, shared by identical concurrent calls
+        self._inflight: Dict[str, asyncio.Future] = {}
+        
+        # Seconds single-record writes wait to share a batch call (None sends them one by one)
+        self.record_batch_window = record_batch_window
+        self._record_batchers: Dict[Tuple[str, str], _RecordBatcher] = {}
+        
+        # Callbacks notified after a write tool succeeds
+        self._write_listeners: List[Callable[[str], None]] = []
+        
+        # Tool categories mapping (shared, read-only)
+        self.tool_categories = TOOL_CATEGORIES
         
         # Performance tracking
         self.stats = {
             'requests_made': 0,
             'successful_requests': 0,
             'failed_requests': 0,
-            'average_response_time': 0.0,
+            'average_response_time': 0.0,  # Over the last RESPONSE_TIME_WINDOW requests
             'last_request_time': None
         }
+        self._response_times: deque = deque(maxlen=RESPONSE_TIME_WINDOW)
     
     async def __aenter__(self):
         """Async context manager entry"""
@@ -119,55 +318,116 @@ class MCPClient:
     async def _ensure_session(self) -> None:
         """Ensure aiohttp session is available"""
         if self.session is None or self.session.closed:
-            timeout = aiohttp.ClientTimeout(total=30)
-            self.session = aiohttp.ClientSession(timeout=timeout)
+            # Pooled keep-alive connections, reused until close()
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=HTTP_POOL_SIZE,
+                    limit_per_host=HTTP_POOL_SIZE,
+                    keepalive_timeout=HTTP_KEEPALIVE_SECONDS,
+                    ttl_dns_cache=300
+                ),
+                timeout=HTTP_TIMEOUT
+            )
+            self._owns_session = True
     
-    async def _make_request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Make a JSON-RPC request to the MCP server"""
-        await self._ensure_session()
-        
+    def use_session(self, session: aiohttp.ClientSession) -> None:
+        """Reuse an externally managed session (its owner closes it)"""
+        self.session = session
+        self._owns_session = False
+    
+    def _next_request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a JSON-RPC request object with a fresh id"""
         self.request_id += 1
-        request_start = datetime.now()
-        
-        payload = {
+        return {
             "jsonrpc": "2.0",
             "id": self.request_id,
             "method": method,
             "params": params
         }
+    
+    @staticmethod
+    def _to_error(error: Dict[str, Any]) -> MCPError:
+        """Convert a JSON-RPC error object to an MCPError"""
+        return MCPError(
+            error.get("message", "Unknown MCP error"),
+            code=error.get("code", -32603),
+            data=error.get("data")
+        )
+    
+    async def _make_request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Make a JSON-RPC request to the MCP server"""
+        self.logger.debug("Making MCP request: %s with params: %s", method, params)
+        response_data = await self._post(self._next_request(method, params))
+        
+        if "error" in response_data:
+            raise self._to_error(response_data["error"])
+        
+        return response_data.get("result", {})
+    
+    async def _make_batch_request(
+        self,
+        calls: List[Tuple[str, Dict[str, Any]]]
+    ) -> Optional[List[Union[Dict[str, Any], MCPError]]]:
+        """
+        Send several JSON-RPC requests as one batch.
+        
+        Returns each call's result (or MCPError) in call order, or None if the
+        server answered with a single response instead of a batch.
+        """
+        payload = [self._next_request(method, params) for method, params in calls]
+        self.logger.debug("Making MCP batch request with %d calls", len(payload))
+        response_data = await self._post(payload)
+        
+        if not isinstance(response_data, list):
+            return None
+        
+        # Responses may arrive in any order; match them up by id
+        responses = {item.get("id"): item for item in response_data if isinstance(item, dict)}
+        results = []
+        for request in payload:
+            response = responses.get(request["id"])
+            if response is None:
+                results.append(MCPError("No response for batched request", code=-32603))
+            elif "error" in response:
+                results.append(self._to_error(response["error"]))
+            else:
+                results.append(response.get("result", {}))
+        
+        return results
+    
+    async def _post(self, payload: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Any:
+        """POST a JSON-RPC payload and return the decoded response body"""
+        await self._ensure_session()
+        request_start = time.perf_counter_ns()
         
         try:
-            self.logger.debug(f"Making MCP request: {method} with params: {params}")
-            
             async with self.session.post(
                 self.server_url,
-                json=payload,
-                headers={'Content-Type': 'application/json'}
+                data=dumps_bytes(payload),
+                headers=JSON_HEADERS
             ) as response:
                 
-                response_time = (datetime.now() - request_start).total_seconds()
+                self._server_reachable = True
+                response_time = (time.perf_counter_ns() - request_start) / 1e9
                 self._update_stats(response_time, success=response.status == 200)
                 
                 if response.status != 200:
                     error_text = await response.text()
                     raise MCPError(
                         f"HTTP {response.status}: {error_text}",
-                        code=-32603
+                        code=-32603,
+                        data={'http_status': response.status}
                     )
                 
-                response_data = await response.json()
-                
-                if "error" in response_data:
-                    error = response_data["error"]
-                    raise MCPError(
-                        error.get("message", "Unknown MCP error"),
-                        code=error.get("code", -32603),
-                        data=error.get("data")
-                    )
-                
-                return response_data.get("result", {})
+                # Parse the raw bytes directly, skipping the str decode of response.json()
+                body = await response.read()
+                if len(body) > LARGE_RESPONSE_BYTES:
+                    return await asyncio.to_thread(loads, body)  # Off the event loop
+                return loads(body)
         
         except aiohttp.ClientError as e:
+            if isinstance(e, aiohttp.ClientConnectorError):
+                self._server_reachable = False
             self._update_stats(0, success=False)
             raise MCPError(f"Network error: {str(e)}", code=-32603)
         
@@ -185,34 +445,56 @@ class MCPClient:
         else:
             self.stats['failed_requests'] += 1
         
-        # Update average response time
-        current_avg = self.stats['average_response_time']
-        total_requests = self.stats['requests_made']
-        self.stats['average_response_time'] = (
-            (current_avg * (total_requests - 1) + response_time) / total_requests
-        )
+        # Rolling average, so recent slowdowns aren't diluted by history
+        self._response_times.append(response_time)
+        self.stats['average_response_time'] = sum(self._response_times) / len(self._response_times)
     
     async def test_connection(self) -> Dict[str, Any]:
         """Test connection to MCP server"""
         try:
             # Try to list available tools as a connection test
-            tools = await self.list_available_tools()
-            await self.close()  # Clean up session
+            tools = await self.list_available_tools(refresh=True)
             return {
                 'status': 'healthy',
                 'tools_available': len(tools),
                 'server_url': self.server_url
             }
         except Exception as e:
-            await self.close()  # Clean up session even on error
             return {
                 'status': 'error',
                 'error': str(e),
                 'server_url': self.server_url
             }
     
-    async def list_available_tools(self) -> List[MCPTool]:
-        """Get list of all available MCP tools"""
+    def _get_cached(self, key: str) -> Optional[Any]:
+        """Return a cached schema response if it hasn't expired"""
+        entry = self._schema_cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._schema_cache[key]
+            return None
+        return entry[1]
+    
+    def _set_cached(self, key: str, value: Any) -> None:
+        """Cache a schema response for SCHEMA_CACHE_TTL seconds"""
+        self._schema_cache[key] = (time.monotonic() + SCHEMA_CACHE_TTL, value)
+    
+    def invalidate_schema_cache(self) -> None:
+        """Drop cached tools/list and schema responses"""
+        self._schema_cache.clear()
+    
+    async def list_available_tools(self, refresh: bool = False) -> List[MCPTool]:
+        """Get list of all available MCP tools (cached unless refresh is set)"""
+        if not refresh:
+            tools = self._get_cached("tools/list")
+            if tools is not None:
+                return list(tools)
+            
+            # Don't retry a server that just refused the connection
+            if self._server_reachable is False:
+                return self._get_known_tools()
+        
         try:
             # Make a tools/list request
             result = await self._make_request("tools/list", {})
@@ -227,6 +509,7 @@ class MCPClient:
                 )
                 tools.append(tool)
             
+            self._set_cached("tools/list", tuple(tools))
             return tools
             
         except MCPError:
@@ -235,48 +518,93 @@ class MCPClient:
     
     def _get_known_tools(self) -> List[MCPTool]:
         """Return list of known tools if server doesn't provide them"""
-        known_tools = []
-        
-        for tool_name, category in self.tool_categories.items():
-            tool = MCPTool(
-                name=tool_name,
-                description=f"{tool_name.replace('_', ' ').title()} operation",
-                parameters={},
-                category=category
-            )
-            known_tools.append(tool)
-        
-        return known_tools
+        return list(KNOWN_TOOLS)
     
     async def execute_tool(self, tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a specific MCP tool"""
-        if tool_name not in self.tool_categories:
+        if tool_name not in VALID_TOOLS:
             raise MCPError(f"Unknown tool: {tool_name}", code=-32601)
         
-        self.logger.info(f"Executing tool: {tool_name}")
+        # Writes always run; reads may be answered from the cache or a call in flight
+        if tool_name in WRITE_TOOLS:
+            return await self._call_tool(tool_name, parameters)
+        
+        key = f"{tool_name}:{dumps(parameters)}"
+        if tool_name in CACHED_SCHEMA_TOOLS:
+            cached = self._get_cached(key)
+            if cached is not None:
+                return copy.deepcopy(cached)  # Callers may edit their response; the cache must not change
+        
+        pending = self._inflight.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._call_tool(tool_name, parameters))
+            self._inflight[key] = pending
+            pending.add_done_callback(lambda done: self._forget_inflight(key, done))
+        
+        # Shielded so one cancelled caller doesn't cancel the call for the others;
+        # each caller gets its own copy of the shared response
+        response = dict(await asyncio.shield(pending))
+        if tool_name in CACHED_SCHEMA_TOOLS and response['success']:
+            self._set_cached(key, copy.deepcopy(response))
+        return response
+    
+    def _forget_inflight(self, key: str, done: asyncio.Future) -> None:
+        """Drop a finished call unless a newer one already took its key"""
+        if self._inflight.get(key) is done:
+            del self._inflight[key]
+    
+    async def _call_tool(self, tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a tools/call request and wrap the outcome"""
+        self.logger.info("Executing tool: %s", tool_name)
         
         try:
             result = await self._make_request("tools/call", {
                 "name": tool_name,
                 "arguments": parameters
             })
-            
-            return {
-                'success': True,
-                'tool': tool_name,
-                'result': result,
-                'timestamp': datetime.now(timezone.utc).isoformat()
-            }
-            
         except MCPError as e:
-            self.logger.error(f"Tool execution failed: {e.message}")
-            return {
-                'success': False,
-                'tool': tool_name,
-                'error': e.message,
-                'error_code': e.code,
-                'timestamp': datetime.now(timezone.utc).isoformat()
-            }
+            return self._tool_failure(tool_name, e)
+        
+        return self._tool_success(tool_name, result)
+    
+    def _tool_success(self, tool_name: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Wrap a tool result, notifying write listeners"""
+        if tool_name in WRITE_TOOLS:
+            if tool_name in SCHEMA_WRITE_TOOLS:
+                self.invalidate_schema_cache()
+            # Reads started before this write must not be shared with later callers
+            self._inflight.clear()
+            self._notify_write(tool_name)
+        
+        return {
+            'success': True,
+            'tool': tool_name,
+            'result': result,
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        }
+    
+    def _tool_failure(self, tool_name: str, error: MCPError) -> Dict[str, Any]:
+        """Wrap a tool error"""
+        self.logger.error("Tool execution failed: %s", error.message)
+        return {
+            'success': False,
+            'tool': tool_name,
+            'error': error.message,
+            'error_code': error.code,
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        }
+    
+    def add_write_listener(self, callback: Callable[[str], None]) -> None:
+        """Register a callback invoked with the tool name after each successful write"""
+        self._write_listeners.append(callback)
+    
+    def _notify_write(self, tool_name: str) -> None:
+        """Notify listeners that Airtable data or schema changed"""
+        for callback in self._write_listeners:
+            try:
+                callback(tool_name)
+            except Exception as e:
+                self.logger.warning("Write listener failed: %s", e)
     
     # Data Operations
     async def list_tables(self) -> Dict[str, Any]:
@@ -296,8 +624,25 @@ class MCPClient:
             "recordId": record_id
         })
     
+    def _record_batcher(self, tool_name: str, table: str) -> _RecordBatcher:
+        """Get the batcher coalescing ``tool_name`` calls on ``table``"""
+        key = (table, tool_name)
+        batcher = self._record_batchers.get(key)
+        if batcher is None:
+            batch_tool, batch_param = RECORD_BATCH_TOOLS[tool_name]
+            
+            async def send(items: List[Any]) -> Dict[str, Any]:
+                return await self.execute_tool(batch_tool, {"table": table, batch_param: items})
+            
+            batcher = self._record_batchers[key] = _RecordBatcher(tool_name, send, self.record_batch_window)
+        return batcher
+    
     async def create_record(self, table: str, fields: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new record"""
+        if self.record_batch_window is not None:
+            batcher = self._record_batcher("create_record", table)
+            if batcher.coalescing:
+                return await batcher.submit({"fields": fields})
         return await self.execute_tool("create_record", {
             "table": table,
             "fields": fields
@@ -305,6 +650,10 @@ class MCPClient:
     
     async def update_record(self, table: str, record_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
         """Update an existing record"""
+        if self.record_batch_window is not None:
+            batcher = self._record_batcher("update_record", table)
+            if batcher.coalescing:
+                return await batcher.submit({"id": record_id, "fields": fields})
         return await self.execute_tool("update_record", {
             "table": table,
             "recordId": record_id,
@@ -313,6 +662,10 @@ class MCPClient:
     
     async def delete_record(self, table: str, record_id: str) -> Dict[str, Any]:
         """Delete a record"""
+        if self.record_batch_window is not None:
+            batcher = self._record_batcher("delete_record", table)
+            if batcher.coalescing:
+                return await batcher.submit(record_id)
         return await self.execute_tool("delete_record", {
             "table": table,
             "recordId": record_id
@@ -381,30 +734,81 @@ class MCPClient:
     
     # Utility methods
     async def bulk_operation(self, operations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Execute multiple operations in parallel"""
-        tasks = []
+        """Execute multiple operations, as one JSON-RPC batch when the server supports it"""
+        calls = [
+            (operation["tool"], operation.get("parameters", {}))
+            for operation in operations
+            if operation.get("tool")
+        ]
         
-        for operation in operations:
-            tool_name = operation.get("tool")
-            parameters = operation.get("parameters", {})
-            
-            if tool_name:
-                task = self.execute_tool(tool_name, parameters)
-                tasks.append(task)
+        if len(calls) > 1 and self._batch_supported:
+            results = await self._bulk_batch(calls)
+            if results is not None:
+                return results
+        
+        processed_results: List[Optional[Dict[str, Any]]] = [None] * len(calls)
+        
+        async def run_one(i: int, tool_name: str, parameters: Dict[str, Any]) -> None:
+            # Failures are recorded in place so one bad call doesn't cancel the group
+            try:
+                processed_results[i] = await self.execute_tool(tool_name, parameters)
+            except Exception as e:
+                processed_results[i] = {
+                    'success': False,
+                    'operation_index': i,
+                    'error': str(e)
+                }
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        if hasattr(asyncio, "TaskGroup"):
+            async with asyncio.TaskGroup() as group:
+                for i, (tool_name, parameters) in enumerate(calls):
+                    group.create_task(run_one(i, tool_name, parameters))
+        else:  # Python 3.10, still in the CI matrix
+            await asyncio.gather(*(
+                run_one(i, tool_name, parameters) for i, (tool_name, parameters) in enumerate(calls)
+            ))
         
-        # Process results and handle exceptions
-        processed_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                processed_results.append({
+        return processed_results
+    
+    async def _bulk_batch(self, calls: List[Tuple[str, Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+        """Run tool calls in one batch; None means fall back to individual requests"""
+        processed_results: List[Optional[Dict[str, Any]]] = [None] * len(calls)
+        batch_calls, batch_indexes = [], []
+        
+        for i, (tool_name, parameters) in enumerate(calls):
+            if tool_name not in VALID_TOOLS:
+                processed_results[i] = {
                     'success': False,
                     'operation_index': i,
-                    'error': str(result)
-                })
+                    'error': f"Unknown tool: {tool_name}"
+                }
             else:
-                processed_results.append(result)
+                batch_calls.append(("tools/call", {"name": tool_name, "arguments": parameters}))
+                batch_indexes.append(i)
+        
+        if batch_calls:
+            try:
+                results = await self._make_batch_request(batch_calls)
+            except MCPError as e:
+                status = (e.data or {}).get('http_status')
+                if status is not None and 400 <= status < 500:
+                    results = None
+                else:
+                    # The batch may have run on the server; retrying could repeat writes
+                    results = [e] * len(batch_calls)
+            
+            if results is None:
+                # Rejected before any call ran, so individual requests are safe
+                self.logger.info("MCP server does not support batches; using individual requests")
+                self._batch_supported = False
+                return None
+            
+            for i, result in zip(batch_indexes, results):
+                tool_name = calls[i][0]
+                if isinstance(result, MCPError):
+                    processed_results[i] = self._tool_failure(tool_name, result)
+                else:
+                    processed_results[i] = self._tool_success(tool_name, result)
         
         return processed_results
     
@@ -413,12 +817,19 @@ class MCPClient:
         return {
             'server_url': self.server_url,
             'stats': self.stats.copy(),
-            'tool_categories': len(set(self.tool_categories.values())),
-            'total_tools': len(self.tool_categories)
+            'median_response_time': statistics.median(self._response_times) if self._response_times else 0.0,
+            'tool_categories': TOOL_CATEGORY_COUNT,
+            'total_tools': len(VALID_TOOLS)
         }
     
     async def close(self) -> None:
-        """Close the HTTP session"""
+        """Close the HTTP session (shared sessions are left to their owner)"""
+        for batcher in self._record_batchers.values():
+            await batcher.drain()
+        
+        if not self._owns_session:
+            return
+        
         if self.session and not self.session.closed:
             await self.session.close()
             self.session = None
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+⚡ Semantic Query Cache for Airtable AI Agent
+Serves repeated and near-duplicate queries without re-running the pipeline.
+"""
+
+import copy
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional
+
+import numpy as np
+
+
+@dataclass
+class CacheEntry:
+    """A cached agent response and where its embedding lives"""
+    response: Dict[str, Any]
+    slot: Optional[int]
+    created_at: float
+    scope: Hashable = None  # Similar queries only share a response within the same scope
+
+
+class SemanticQueryCache:
+    """
+    LRU + TTL cache for agent responses.
+
+    Lookups first try the whitespace-normalized query text, then fall back
+    to the most similar cached query embedding (cosine similarity over
+    L2-normalized vectors held in a single matrix). A similarity hit is only
+    accepted when the cached entry was stored with the same ``scope``
+    (e.g. the tables and records the query refers to); responses put
+    without an embedding are served for exact matches only.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 300, threshold: float = 0.9):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.threshold = threshold
+
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+
+        # Embedding matrix, allocated once the dimension is known
+        self._vectors: Optional[np.ndarray] = None
+        self._occupied = np.zeros(max_size, dtype=bool)
+        self._slot_keys: List[Optional[str]] = [None] * max_size
+        self._free_slots = list(range(max_size - 1, -1, -1))
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'invalidations': 0
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        """Collapse whitespace so trivially different queries share a key"""
+        return ' '.join(query.split())
+
+    @staticmethod
+    def _normalize_embedding(embedding: Any) -> Optional[np.ndarray]:
+        """Return an L2-normalized float32 vector, or None if unusable"""
+        if embedding is None:
+            return None
+        try:
+            vector = np.asarray(embedding, dtype=np.float32).ravel()
+        except (TypeError, ValueError):
+            return None
+
+        norm = float(np.linalg.norm(vector)) if vector.size else 0.0
+        if not norm:
+            return None
+        return vector / norm
+
+    def get(self, query: str, embedding: Any = None, scope: Hashable = None) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached response for a query, if any"""
+        key = self._normalize_query(query)
+        entry = self._entries.get(key)
+
+        if entry is None:
+            vector = self._normalize_embedding(embedding)
+            if vector is not None:
+                key = self._nearest(vector, scope)
+                entry = self._entries.get(key) if key else None
+
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+
+        if time.monotonic() - entry.created_at > self.ttl:
+            self._remove(key)
+            self.stats['misses'] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats['hits'] += 1
+        return copy.deepcopy(entry.response)
+
+    def put(
+        self,
+        query: str,
+        response: Dict[str, Any],
+        embedding: Any = None,
+        scope: Hashable = None
+    ) -> None:
+        """Cache a response, evicting the least recently used entry if full"""
+        key = self._normalize_query(query)
+        if key in self._entries:
+            self._remove(key)
+
+        while len(self._entries) >= self.max_size:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.stats['evictions'] += 1
+
+        slot = None
+        vector = self._normalize_embedding(embedding)
+        if vector is not None:
+            if self._vectors is None or self._vectors.shape[1] != vector.size:
+                # First embedding (or a new model): (re)allocate the matrix
+                self._reset_vectors(vector.size)
+            slot = self._free_slots.pop()
+            self._vectors[slot] = vector
+            self._occupied[slot] = True
+            self._slot_keys[slot] = key
+
+        self._entries[key] = CacheEntry(
+            response=copy.deepcopy(response),
+            slot=slot,
+            created_at=time.monotonic(),
+            scope=scope
+        )
+
+    def invalidate(self) -> None:
+        """Drop every cached response (e.g. after a write to Airtable)"""
+        if self._entries:
+            self.stats['invalidations'] += 1
+        self._entries.clear()
+        self._occupied[:] = False
+        self._slot_keys = [None] * self.max_size
+        self._free_slots = list(range(self.max_size - 1, -1, -1))
+
+    def _nearest(self, vector: np.ndarray, scope: Hashable = None) -> Optional[str]:
+        """Find the most similar cached query with the same scope"""
+        if self._vectors is None or vector.size != self._vectors.shape[1]:
+            return None
+        if not self._occupied.any():
+            return None
+
+        similarities = self._vectors @ vector
+        similarities[~self._occupied] = -np.inf
+
+        # Best first among those over the threshold, skipping other scopes
+        candidates = np.flatnonzero(similarities >= self.threshold)
+        for slot in candidates[np.argsort(-similarities[candidates])]:
+            key = self._slot_keys[slot]
+            if self._entries[key].scope == scope:
+                return key
+        return None
+
+    def _reset_vectors(self, dim: int) -> None:
+        """Allocate a fresh embedding matrix, detaching existing entries"""
+        self._vectors = np.zeros((self.max_size, dim), dtype=np.float32)
+        for entry in self._entries.values():
+            entry.slot = None
+        self._occupied[:] = False
+        self._slot_keys = [None] * self.max_size
+        self._free_slots = list(range(self.max_size - 1, -1, -1))
+
+    def _remove(self, key: str) -> None:
+        """Remove an entry and release its embedding slot"""
+        entry = self._entries.pop(key, None)
+        if entry is None or entry.slot is None:
+            return
+        self._occupied[entry.slot] = False
+        self._slot_keys[entry.slot] = None
+        self._free_slots.append(entry.slot)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+            'threshold': self.threshold,
+            **self.stats
+        }
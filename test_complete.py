@@ -5,6 +5,7 @@ Validates all components work correctly before deployment.
 """
 
 import asyncio
+import importlib
 import json
 import logging
 import sys
@@ -18,6 +19,28 @@ sys.path.insert(0, str(Path.cwd()))
 # Test results
 test_results: List[Dict[str, Any]] = []
 
+# Agent shared by the tests that only need a ready agent
+_shared_agent = None
+_shared_agent_lock = asyncio.Lock()
+
+# Maximum number of tests running at once
+MAX_CONCURRENT_TESTS = 4
+
+
+async def get_shared_agent():
+    """Initialize the shared agent on first use"""
+    global _shared_agent
+    
+    async with _shared_agent_lock:
+        if _shared_agent is None:
+            from src.agent_basic import AirtableAIAgentBasic
+            
+            agent = AirtableAIAgentBasic()
+            await agent.initialize()
+            _shared_agent = agent
+    
+    return _shared_agent
+
 
 def log_test_result(test_name: str, passed: bool, details: str = "", duration: float = 0.0):
     """Log a test result"""
@@ -35,15 +58,31 @@ def log_test_result(test_name: str, passed: bool, details: str = "", duration: f
         print(f"   Details: {details}")
 
 
+# Modules checked by test_imports and the names each must export
+IMPORT_CHECKS = {
+    'src.context_manager_basic': ('ContextManagerBasic', 'DocumentChunk'),
+    'src.mcp_client': ('MCPClient', 'MCPError'),
+    'src.airtable_expert': ('AirtableExpert', 'QueryIntent'),
+    'src.agent_basic': ('AirtableAIAgentBasic',)
+}
+
+
 async def test_imports():
     """Test all imports work correctly"""
     start_time = time.time()
     
     try:
-        from src.context_manager_basic import ContextManagerBasic, DocumentChunk
-        from src.mcp_client import MCPClient, MCPError
-        from src.airtable_expert import AirtableExpert, QueryIntent
-        from src.agent_basic import AirtableAIAgentBasic
+        # Import sibling modules in parallel so their file I/O overlaps
+        loop = asyncio.get_running_loop()
+        modules = await asyncio.gather(*[
+            loop.run_in_executor(None, importlib.import_module, name)
+            for name in IMPORT_CHECKS
+        ])
+        
+        for module, names in zip(modules, IMPORT_CHECKS.values()):
+            for name in names:
+                if not hasattr(module, name):
+                    raise ImportError(f"cannot import name '{name}' from '{module.__name__}'")
         
         log_test_result("Import all modules", True, "All imports successful", time.time() - start_time)
         return True
@@ -101,6 +140,7 @@ async def test_mcp_client():
         
         # Test basic functionality
         tools = await client.list_available_tools()
+        await client.close()
         
         if isinstance(connection_result, dict) and isinstance(tools, list):
             log_test_result("MCP Client", True, 
@@ -206,11 +246,7 @@ async def test_query_processing():
     start_time = time.time()
     
     try:
-        from src.agent_basic import AirtableAIAgentBasic
-        
-        # Create and initialize agent
-        agent = AirtableAIAgentBasic()
-        await agent.initialize()
+        agent = await get_shared_agent()
         
         # Test different types of queries
         test_queries = [
@@ -233,8 +269,6 @@ async def test_query_processing():
             except Exception:
                 pass
         
-        await agent.shutdown()
-        
         avg_processing_time = total_processing_time / max(successful_queries, 1)
         
         if successful_queries >= len(test_queries) // 2:
@@ -258,11 +292,7 @@ async def test_performance():
     start_time = time.time()
     
     try:
-        from src.agent_basic import AirtableAIAgentBasic
-        
-        # Create agent
-        agent = AirtableAIAgentBasic()
-        await agent.initialize()
+        agent = await get_shared_agent()
         
         # Test concurrent queries
         queries = ["What is Airtable?" for _ in range(3)]
@@ -274,8 +304,6 @@ async def test_performance():
         )
         concurrent_time = time.time() - concurrent_start
         
-        await agent.shutdown()
-        
         # Count successful responses
         successful = sum(1 for r in responses if isinstance(r, dict) and r.get('answer'))
         
@@ -311,7 +339,17 @@ async def run_all_tests():
         test_performance()
     ]
     
-    await asyncio.gather(*tests)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_TESTS)
+    
+    async def guarded(test):
+        async with semaphore:
+            return await test
+    
+    try:
+        await asyncio.gather(*(guarded(test) for test in tests))
+    finally:
+        if _shared_agent is not None:
+            await _shared_agent.shutdown()
     
     # Report results
     print("\n" + "=" * 60)
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+🧪 Shared fixtures for Airtable AI Agent tests
+"""
+
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def aio_benchmark(request):
+    """Benchmark a coroutine function on a private event loop (requires pytest-benchmark)"""
+    pytest.importorskip("pytest_benchmark")
+    benchmark = request.getfixturevalue("benchmark")
+    loop = asyncio.new_event_loop()
+    
+    def run(func, *args, **kwargs):
+        return benchmark(lambda: loop.run_until_complete(func(*args, **kwargs)))
+    
+    run.benchmark = benchmark  # For extra_info and stats
+    yield run
+    loop.close()
@@ -6,14 +6,76 @@ Comprehensive test suite ensuring reliability and performance.
 
 import asyncio
 import json
+import numpy as np
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
+from dataclasses import replace
 from datetime import datetime
 
 from src.agent import AirtableAIAgent, AgentConfig
 from src.context_manager import ContextManager, DocumentChunk
 from src.mcp_client import MCPClient, MCPError
-from src.airtable_expert import AirtableExpert, QueryIntent, QueryAnalysis
+from src.airtable_expert import AirtableExpert, AirtableOperation, QueryIntent, QueryAnalysis, group_operation_waves
+from src.query_cache import SemanticQueryCache
+from src.json_utils import dumps, loads
+
+
+# Simple data query analysis shared by tests (frozen; vary it with replace())
+SIMPLE_ANALYSIS = QueryAnalysis(
+    intent=QueryIntent.DATA_QUERY,
+    confidence=0.8,
+    entities={},
+    required_tools=[],
+    context_categories=['api'],
+    complexity='simple'
+)
+
+# Shared chunk body for the memory test (1000 words)
+LARGE_CONTENT = "Large content " * 1000
+
+
+class _StubMethod:
+    """Awaitable stand-in for one async method, much cheaper to build than AsyncMock"""
+    
+    def __init__(self):
+        self.return_value = None
+        self.side_effect = None  # Exception to raise, or callable computing the result
+        self.call_count = 0
+    
+    async def __call__(self, *args, **kwargs):
+        self.call_count += 1
+        if isinstance(self.side_effect, BaseException):
+            raise self.side_effect
+        if self.side_effect is not None:
+            return self.side_effect(*args, **kwargs)
+        return self.return_value
+    
+    def assert_called_once(self):
+        assert self.call_count == 1, f"Expected one call, got {self.call_count}"
+
+
+class _AsyncStub:
+    """Component stub whose methods are created on first use and checked against ``spec``"""
+    
+    def __init__(self, spec: type, **returns):
+        self._spec = spec
+        for name, value in returns.items():
+            getattr(self, name).return_value = value
+    
+    def __getattr__(self, name):
+        if name.startswith('_') or not hasattr(self._spec, name):
+            raise AttributeError(name)
+        method = _StubMethod()
+        setattr(self, name, method)
+        return method
+
+
+def _stub_components(agent):
+    """Replace an agent's components with stubs"""
+    agent.context_manager = _AsyncStub(ContextManager, get_relevant_context=[])
+    agent.context_manager.embed_batch.side_effect = lambda queries: [None] * len(queries)
+    agent.mcp_client = _AsyncStub(MCPClient)
+    agent.airtable_expert = _AsyncStub(AirtableExpert)
 
 
 class TestAirtableAIAgent:
@@ -32,10 +94,8 @@ class TestAirtableAIAgent:
         agent = AirtableAIAgent()
         agent.config = config
         
-        # Mock components
-        agent.context_manager = AsyncMock(spec=ContextManager)
-        agent.mcp_client = AsyncMock(spec=MCPClient)
-        agent.airtable_expert = AsyncMock(spec=AirtableExpert)
+        # Stub components
+        _stub_components(agent)
         
         return agent
     
@@ -44,19 +104,16 @@ class TestAirtableAIAgent:
         """Test agent initialization"""
         agent = AirtableAIAgent()
         assert agent.config.name == "Airtable AI Agent"
-        assert agent.metrics['requests_handled'] == 0
+        assert agent.metrics.requests_handled == 0
     
     @pytest.mark.asyncio
     async def test_process_simple_query(self, agent):
         """Test processing a simple query"""
         # Setup mocks
-        analysis = QueryAnalysis(
-            intent=QueryIntent.DATA_QUERY,
-            confidence=0.8,
+        analysis = replace(
+            SIMPLE_ANALYSIS,
             entities={'table_names': ['Tasks']},
-            required_tools=['list_records'],
-            context_categories=['api'],
-            complexity='simple'
+            required_tools=['list_records']
         )
         
         agent.airtable_expert.analyze_query.return_value = analysis
@@ -77,7 +134,7 @@ class TestAirtableAIAgent:
         assert response['success'] is True
         assert 'answer' in response
         assert 'metadata' in response
-        assert agent.metrics['requests_handled'] == 1
+        assert agent.metrics.requests_handled == 1
     
     @pytest.mark.asyncio
     async def test_process_query_with_mcp_operations(self, agent):
@@ -118,7 +175,7 @@ class TestAirtableAIAgent:
         
         # Assertions
         assert response['success'] is True
-        assert agent.metrics['mcp_calls_made'] == 1
+        assert agent.metrics.mcp_calls_made == 1
         agent.mcp_client.execute_tool.assert_called_once()
     
     @pytest.mark.asyncio
@@ -134,20 +191,30 @@ class TestAirtableAIAgent:
         # Assertions
         assert response['success'] is False
         assert 'error' in response
-        assert agent.metrics['errors_handled'] == 1
+        assert agent.metrics.errors_handled == 1
+    
+    @pytest.mark.asyncio
+    async def test_queries_with_context_bypass_cache(self, agent):
+        """Test follow-up queries aren't answered from another context's cached response"""
+        agent.airtable_expert.analyze_query.return_value = SIMPLE_ANALYSIS
+        agent.airtable_expert.plan_operations.return_value = []
+        agent.airtable_expert.generate_response.return_value = {
+            'success': True,
+            'answer': 'Query processed'
+        }
+        
+        await agent.process_query("What about the next one?", context={'table': 'Tasks'})
+        response = await agent.process_query("What about the next one?", context={'table': 'Projects'})
+        
+        assert response['metadata']['cache_hit'] is False
+        assert agent.airtable_expert.generate_response.call_count == 2
+        assert len(agent.query_cache) == 0
     
     @pytest.mark.asyncio
     async def test_batch_processing(self, agent):
         """Test batch query processing"""
         # Setup mocks for successful processing
-        agent.airtable_expert.analyze_query.return_value = QueryAnalysis(
-            intent=QueryIntent.DATA_QUERY,
-            confidence=0.8,
-            entities={},
-            required_tools=[],
-            context_categories=['api'],
-            complexity='simple'
-        )
+        agent.airtable_expert.analyze_query.return_value = SIMPLE_ANALYSIS
         agent.airtable_expert.plan_operations.return_value = []
         agent.airtable_expert.generate_response.return_value = {
             'success': True,
@@ -163,6 +230,22 @@ class TestAirtableAIAgent:
         assert len(responses) == 3
         assert all(r.get('success', True) for r in responses)
     
+    @pytest.mark.asyncio
+    async def test_batch_processing_survives_embedding_failure(self, agent):
+        """A failed batch embedding falls back to per-query embedding"""
+        agent.airtable_expert.analyze_query.return_value = SIMPLE_ANALYSIS
+        agent.airtable_expert.plan_operations.return_value = []
+        agent.airtable_expert.generate_response.return_value = {
+            'success': True,
+            'answer': 'Query processed'
+        }
+        agent.context_manager.embed_batch.side_effect = RuntimeError("model unavailable")
+        
+        responses = await agent.batch_process(["Query 1", "Query 2"])
+        
+        assert [r['success'] for r in responses] == [True, True]
+        assert agent.context_manager.embed.call_count == 2
+    
     @pytest.mark.asyncio
     async def test_get_capabilities(self, agent):
         """Test capabilities retrieval"""
@@ -194,6 +277,23 @@ class TestAirtableAIAgent:
         assert health['overall_status'] == 'healthy'
         assert 'checks' in health
         assert 'uptime' in health
+    
+    @pytest.mark.asyncio
+    async def test_log_listener_replaced_and_released(self):
+        """Test agents share one log listener and shutdown logs directly again"""
+        import logging.handlers
+        
+        first, second = AirtableAIAgent(), AirtableAIAgent()
+        listener = second._log_listener
+        assert first._log_listener._thread is None  # Stopped when replaced
+        
+        _stub_components(second)
+        await second.shutdown()
+        
+        assert listener._thread is None
+        assert not any(
+            isinstance(handler, logging.handlers.QueueHandler) for handler in second.logger.handlers
+        )
 
 
 class TestContextManager:
@@ -235,7 +335,19 @@ Section 2 content
         
         assert len(truncated) < len(content)
         assert "[Content truncated...]" in truncated
-    
+
+    def test_truncate_reuses_token_ids(self, context_manager):
+        """Test truncation reuses a chunk's cached token ids"""
+        chunk = DocumentChunk(id="t1", content="Airtable records. " * 400, title="T", category="api", tokens=800)
+        token_ids = context_manager._get_token_ids(chunk)
+        context_manager.tokenizer = MagicMock(wraps=context_manager.tokenizer)
+
+        truncated = context_manager._truncate_content(chunk.content, 600, context_manager._get_token_ids(chunk))
+
+        assert context_manager._get_token_ids(chunk) is token_ids
+        context_manager.tokenizer.encode.assert_not_called()
+        assert "[Content truncated...]" in truncated
+
     @pytest.mark.asyncio
     async def test_get_relevant_context(self, context_manager):
         """Test context retrieval"""
@@ -259,6 +371,140 @@ Section 2 content
         
         assert len(relevant_chunks) >= 0
         assert isinstance(relevant_chunks, list)
+    
+    @pytest.mark.asyncio
+    async def test_category_boost_from_query_analysis(self, context_manager):
+        """Test QueryAnalysis intents boost their documentation category"""
+        context_manager.chunks = [
+            DocumentChunk(id="api1", content="", title="API", category="api", tokens=10, embedding=[1.0, 0.0]),
+            DocumentChunk(id="fx1", content="", title="Formulas", category="formulas", tokens=10, embedding=[0.95, 0.0])
+        ]
+        analysis = QueryAnalysis(
+            intent=QueryIntent.FORMULA_HELP, confidence=0.9, entities={},
+            required_tools=[], context_categories=["formulas"], complexity="simple"
+        )
+
+        relevant_chunks = await context_manager.get_relevant_context(
+            "sum fields", analysis=analysis, query_embedding=np.array([1.0, 0.0])
+        )
+
+        assert [chunk.id for chunk in relevant_chunks] == ["fx1", "api1"]
+
+    def test_embedding_matrix_tracks_chunk_edits(self, context_manager):
+        """Test in-place chunk edits rebuild the matrix once invalidated"""
+        context_manager.chunks = [
+            DocumentChunk(id="a", content="", title="", category="api", tokens=1, embedding=[1.0, 0.0]),
+            DocumentChunk(id="b", content="", title="", category="api", tokens=1, embedding=[0.0, 1.0])
+        ]
+        context_manager._get_embedding_matrix()
+        
+        context_manager.chunks[0] = DocumentChunk(
+            id="c", content="", title="", category="api", tokens=1, embedding=[0.5, 0.5]
+        )
+        context_manager.invalidate_embedding_matrix()
+        matrix, _ = context_manager._get_embedding_matrix()
+        
+        assert context_manager.row_of_id == {"c": 0, "b": 1}
+        assert matrix[0].tolist() == [0.5, 0.5]
+
+    @pytest.mark.asyncio
+    async def test_embedding_cache(self, tmp_path):
+        """Test unchanged content is not re-embedded"""
+        context_manager = ContextManager(max_tokens=1000, cache_dir=str(tmp_path))
+        context_manager.embedder = MagicMock()
+        context_manager.embedder.encode.side_effect = lambda texts: [[0.5, 0.5]] * len(texts)
+        
+        await context_manager._embed_with_cache(["alpha", "beta"])
+        embeddings = await context_manager._embed_with_cache(["alpha", "beta", "gamma"])
+        
+        assert embeddings == [[0.5, 0.5]] * 3
+        context_manager.embedder.encode.assert_called_with(["gamma"])
+        assert context_manager.stats['embeddings_computed'] == 3
+        assert context_manager.stats['cache_hits'] == 2
+    
+    @pytest.mark.asyncio
+    async def test_embedding_cache_dedupes_misses(self, tmp_path):
+        """Test repeated uncached content is encoded once"""
+        context_manager = ContextManager(max_tokens=1000, cache_dir=str(tmp_path))
+        context_manager.embedder = MagicMock()
+        context_manager.embedder.encode.side_effect = lambda texts: [[0.5, 0.5]] * len(texts)
+        
+        embeddings = await context_manager._embed_with_cache(["alpha", "beta", "alpha"])
+        
+        assert len(embeddings) == 3
+        context_manager.embedder.encode.assert_called_once_with(["alpha", "beta"])
+    
+    @pytest.mark.asyncio
+    async def test_query_embedding_cache(self, tmp_path):
+        """Test repeated queries reuse the cached embedding"""
+        context_manager = ContextManager(max_tokens=1000, cache_dir=str(tmp_path))
+        context_manager.embedder = MagicMock()
+        context_manager.embedder.encode.return_value = [0.1, 0.2]
+
+        first = await context_manager.embed("list records")
+        second = await context_manager.embed("list records")
+
+        assert second is first
+        context_manager.embedder.encode.assert_called_once()
+        assert context_manager.stats['cache_hits'] == 1
+
+    @pytest.mark.asyncio
+    async def test_ann_index_for_large_corpus(self, tmp_path):
+        """Test large corpora are searched through the HNSW index"""
+        pytest.importorskip("hnswlib")
+        context_manager = ContextManager(max_tokens=1000, cache_dir=str(tmp_path), ann_threshold=5)
+        rng = np.random.default_rng(0)
+        context_manager.chunks = [
+            DocumentChunk(id=f"c{i}", content="", title="", category="api", tokens=1,
+                          embedding=rng.normal(size=16).tolist())
+            for i in range(50)
+        ]
+        context_manager._build_ann_index()
+        query = np.asarray(context_manager.chunks[7].embedding)
+
+        relevant_chunks = await context_manager.get_relevant_context("q", max_chunks=3, query_embedding=query)
+
+        assert context_manager._ann_index is not None
+        assert any(tmp_path.glob("ann_*.bin"))
+        assert relevant_chunks[0].id == "c7"
+
+    @pytest.mark.asyncio
+    async def test_query_projection(self, tmp_path):
+        """Test query vectors are reduced with the fitted PCA basis"""
+        context_manager = ContextManager(max_tokens=1000, cache_dir=str(tmp_path), reduced_dim=4)
+        rng = np.random.default_rng(0)
+        chunks = [
+            DocumentChunk(id=f"c{i}", content="", title="", category="api", tokens=1,
+                          embedding=rng.normal(size=16).tolist())
+            for i in range(16)
+        ]
+        
+        # Too few chunks for a meaningful basis: queries keep full dimension
+        context_manager.chunks = chunks[:10]
+        context_manager._fit_query_projection()
+        assert (await context_manager.reduce_embedding(rng.normal(size=16))).shape == (16,)
+        
+        context_manager.chunks = chunks
+        context_manager._fit_query_projection()
+        
+        reduced = await context_manager.reduce_embedding(rng.normal(size=16))
+        assert reduced.shape == (4,)
+        assert any(tmp_path.glob("pca_*.npz"))
+
+    @pytest.mark.asyncio
+    async def test_embeddings_reload_from_memmap(self, tmp_path):
+        """Test ingested embeddings are reloaded from the memory-mapped file"""
+        context_manager = ContextManager(max_tokens=1000, cache_dir=str(tmp_path))
+        context_manager.embedder = MagicMock()
+        context_manager.embedder.encode.side_effect = lambda texts: [[float(len(t)), 1.0] for t in texts]
+        await context_manager._ingest_chunks([("alpha", "A", "api"), ("gamma ray", "G", "mcp")])
+
+        reloaded = ContextManager(max_tokens=1000, cache_dir=str(tmp_path))
+        await reloaded._load_chunks_from_db()
+
+        assert isinstance(reloaded.embedding_matrix, np.memmap)
+        assert [chunk.title for chunk in reloaded.chunks] == ["A", "G"]
+        assert reloaded.chunks[1].embedding.tolist() == [9.0, 1.0]
 
 
 class TestMCPClient:
@@ -328,6 +574,145 @@ class TestMCPClient:
             assert result['success'] is False
             assert 'error' in result
     
+    @pytest.mark.asyncio
+    async def test_shared_session_not_closed(self):
+        """Test an injected session is left open for its owner"""
+        session = MagicMock()
+        session.closed = False
+        session.close = AsyncMock()
+        
+        client = MCPClient("http://localhost:8010/mcp", session=session)
+        await client.close()
+        
+        session.close.assert_not_called()
+        assert client.session is session
+    
+    @pytest.mark.asyncio
+    async def test_bulk_operation_batches_calls(self):
+        """Test bulk operations go out as one JSON-RPC batch"""
+        response = MagicMock()
+        response.status = 200
+        response.read = AsyncMock(return_value=json.dumps([
+            {"jsonrpc": "2.0", "id": 2, "error": {"code": -32000, "message": "Not found"}},
+            {"jsonrpc": "2.0", "id": 1, "result": {"tables": []}}
+        ]).encode())
+        session = MagicMock()
+        session.closed = False
+        session.post.return_value.__aenter__ = AsyncMock(return_value=response)
+        session.post.return_value.__aexit__ = AsyncMock(return_value=False)
+        
+        client = MCPClient("http://localhost:8010/mcp", session=session)
+        results = await client.bulk_operation([
+            {"tool": "list_tables"},
+            {"tool": "get_record", "parameters": {"table": "T", "recordId": "rec1"}},
+            {"tool": "not_a_tool"}
+        ])
+        
+        assert session.post.call_count == 1
+        assert results[0]['success'] is True
+        assert results[1]['success'] is False and results[1]['error'] == 'Not found'
+        assert results[2]['success'] is False and results[2]['operation_index'] == 2
+    
+    @pytest.mark.asyncio
+    async def test_schema_cache_invalidated_by_schema_writes(self, mcp_client):
+        """Test base schema responses are cached until the schema changes"""
+        mcp_client._make_request = AsyncMock(return_value={"tables": []})
+        
+        first = await mcp_client.get_base_schema()
+        first['result']['tables'].append({"name": "Edited"})  # Must not reach the cache
+        second = await mcp_client.get_base_schema()
+        assert second['result'] == {"tables": []}
+        assert second is not first
+        assert mcp_client._make_request.await_count == 1
+        
+        await mcp_client.create_table("Projects", [])
+        await mcp_client.get_base_schema()
+        assert mcp_client._make_request.await_count == 3
+    
+    @pytest.mark.asyncio
+    async def test_identical_reads_are_coalesced(self, mcp_client):
+        """Test concurrent identical reads share one request while writes do not"""
+        async def respond(method, params):
+            await asyncio.sleep(0.01)
+            return {"records": []}
+        
+        mcp_client._make_request = AsyncMock(side_effect=respond)
+        
+        reads = await asyncio.gather(*[mcp_client.list_records("Tasks") for _ in range(3)])
+        assert mcp_client._make_request.await_count == 1
+        assert all(result['success'] for result in reads)
+        assert len({id(result) for result in reads}) == 3
+        
+        await asyncio.gather(*[mcp_client.create_record("Tasks", {"Name": "A"}) for _ in range(2)])
+        assert mcp_client._make_request.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_record_writes_are_batched(self, mcp_client):
+        """Test bursty single-record writes share batch calls when batching is enabled"""
+        mcp_client.record_batch_window = 0.01
+    
+        async def make_request(method, params):
+            return {"records": [{"id": f"rec{item['fields']['Name']}"} for item in params["arguments"]["records"]]}
+        mcp_client._make_request = AsyncMock(side_effect=make_request)
+    
+        results = await asyncio.gather(*[
+            mcp_client.create_record("Tasks", {"Name": str(i)}) for i in range(12)
+        ])
+    
+        calls = mcp_client._make_request.await_args_list
+        assert [call.args[1]["name"] for call in calls] == ["batch_create_records"] * 2
+        assert [len(call.args[1]["arguments"]["records"]) for call in calls] == [10, 2]
+        assert [result['result'] for result in results] == [{"id": f"rec{i}"} for i in range(12)]
+        assert all(result['success'] and result['tool'] == "create_record" for result in results)
+    
+    @pytest.mark.asyncio
+    async def test_batched_writes_split_text_content(self, mcp_client):
+        """Test records in an MCP text reply are split per caller"""
+        mcp_client.record_batch_window = 0.01
+    
+        async def make_request(method, params):
+            ids = [{"id": f"rec{item['fields']['Name']}"} for item in params["arguments"]["records"]]
+            return {"content": [{"type": "text", "text": json.dumps({"records": ids})}]}
+        mcp_client._make_request = AsyncMock(side_effect=make_request)
+    
+        results = await asyncio.gather(*[
+            mcp_client.create_record("Tasks", {"Name": str(i)}) for i in range(3)
+        ])
+    
+        texts = [result['result']['content'][0]['text'] for result in results]
+        assert [json.loads(text) for text in texts] == [{"id": f"rec{i}"} for i in range(3)]
+    
+    @pytest.mark.asyncio
+    async def test_unsplittable_batch_stops_coalescing(self, mcp_client):
+        """Test callers never see each other's records when a batch reply can't be split"""
+        mcp_client.record_batch_window = 0.01
+        mcp_client._make_request = AsyncMock(
+            return_value={"content": [{"type": "text", "text": "Created 2 records"}]}
+        )
+    
+        results = await asyncio.gather(*[
+            mcp_client.create_record("Tasks", {"Name": str(i)}) for i in range(2)
+        ])
+        assert [result['result'] for result in results] == [None, None]
+    
+        await mcp_client.create_record("Tasks", {"Name": "2"})
+        assert mcp_client._make_request.await_args.args[1]["name"] == "create_record"
+    
+    @pytest.mark.asyncio
+    async def test_unreachable_server_skips_tools_request(self):
+        """Test tool listing falls back without reconnecting after a refused connection"""
+        client = MCPClient("http://127.0.0.1:9/mcp")
+        try:
+            status = await client.test_connection()
+            assert client._server_reachable is False
+    
+            client._make_request = AsyncMock()
+            tools = await client.list_available_tools()
+            client._make_request.assert_not_awaited()
+            assert len(tools) == status['tools_available']
+        finally:
+            await client.close()
+    
     def test_tool_categorization(self, mcp_client):
         """Test tool category mapping"""
         assert mcp_client.tool_categories['list_records'] == 'data'
@@ -338,11 +723,19 @@ class TestMCPClient:
 class TestAirtableExpert:
     """Test cases for Airtable Expert"""
     
-    @pytest.fixture
-    def expert(self):
-        """Create test Airtable expert"""
+    @pytest.fixture(scope="session")
+    def shared_expert(self):
+        """Build the expert's pattern tables once for the whole run"""
         return AirtableExpert()
     
+    @pytest.fixture
+    def expert(self, shared_expert):
+        """Provide the shared expert with its caches reset"""
+        shared_expert.cache_size = 1024
+        shared_expert._analysis_cache.clear()
+        shared_expert._error_suggestion_cache.clear()
+        return shared_expert
+    
     def test_intent_detection(self, expert):
         """Test query intent detection"""
         # Test data query intent
@@ -396,13 +789,10 @@ class TestAirtableExpert:
     @pytest.mark.asyncio
     async def test_operation_planning(self, expert):
         """Test operation planning"""
-        analysis = QueryAnalysis(
-            intent=QueryIntent.DATA_QUERY,
-            confidence=0.8,
+        analysis = replace(
+            SIMPLE_ANALYSIS,
             entities={'table_names': ['Tasks']},
-            required_tools=['list_records'],
-            context_categories=['api'],
-            complexity='simple'
+            required_tools=['list_records']
         )
         
         operations = await expert.plan_operations("List tasks", analysis)
@@ -411,17 +801,30 @@ class TestAirtableExpert:
         assert all(hasattr(op, 'tool_name') for op in operations)
         assert all(hasattr(op, 'parameters') for op in operations)
     
+    def test_operation_waves(self):
+        """Test independent operations share a wave and dependents wait"""
+        operations = [
+            AirtableOperation(tool_name="get_base_schema", parameters={}),
+            AirtableOperation(tool_name="list_tables", parameters={}),
+            AirtableOperation(tool_name="list_records", parameters={},
+                              dependencies=["get_base_schema"])
+        ]
+        
+        assert group_operation_waves(operations) == [[0, 1], [2]]
+    
+    def test_entity_extraction_record_ids(self, expert):
+        """Test record IDs need word boundaries and exactly 14 characters"""
+        entities = expert._extract_entities(
+            "Update recABCDEFGHIJKLMN, skip xrecABCDEFGHIJKLMN and recSHORT, then rec12345678901234"
+        )
+        
+        assert entities['record_ids'] == ["recABCDEFGHIJKLMN", "rec12345678901234"]
+        assert 'record_ids' not in expert._extract_entities("recABCDEFGHIJKLMN_1")
+    
     @pytest.mark.asyncio
     async def test_response_generation(self, expert):
         """Test response generation"""
-        analysis = QueryAnalysis(
-            intent=QueryIntent.DATA_QUERY,
-            confidence=0.8,
-            entities={},
-            required_tools=[],
-            context_categories=['api'],
-            complexity='simple'
-        )
+        analysis = SIMPLE_ANALYSIS
         
         mcp_results = [{
             'success': True,
@@ -435,6 +838,18 @@ class TestAirtableExpert:
         assert 'answer' in response
         assert 'intent' in response
     
+    @pytest.mark.asyncio
+    async def test_analysis_cache(self, expert):
+        """Test repeated queries reuse the cached analysis"""
+        first = await expert.analyze_query("List all records in Tasks")
+        second = await expert.analyze_query("List all records in Tasks")
+        
+        assert first is second
+        
+        expert.cache_size = 1
+        await expert.analyze_query("Create a new table")
+        assert "List all records in Tasks" not in expert._analysis_cache
+    
     @pytest.mark.asyncio
     async def test_error_suggestions(self, expert):
         """Test error suggestion generation"""
@@ -446,6 +861,96 @@ class TestAirtableExpert:
 
 
 # Performance and Integration Tests
+class TestSemanticQueryCache:
+    """Test cases for the semantic query cache"""
+    
+    def test_exact_hit(self):
+        """Test whitespace-normalized exact lookups"""
+        cache = SemanticQueryCache(max_size=4)
+        cache.put("List  all tables", {'answer': 'tables'})
+        
+        assert cache.get("List all tables")['answer'] == 'tables'
+        assert cache.get("Delete all tables") is None
+    
+    def test_semantic_hit(self):
+        """Test near-duplicate queries hit via embedding similarity"""
+        cache = SemanticQueryCache(max_size=4, threshold=0.9)
+        cache.put("Show me all tables", {'answer': 'tables'}, [1.0, 0.0, 0.1])
+        
+        assert cache.get("Show all tables", [1.0, 0.0, 0.12])['answer'] == 'tables'
+        assert cache.get("Delete a record", [0.0, 1.0, 0.0]) is None
+    
+    def test_semantic_hit_requires_same_scope(self):
+        """Test similar queries about different tables don't share a response"""
+        cache = SemanticQueryCache(max_size=4, threshold=0.9)
+        tasks, projects = (('table_names', ('Tasks',)),), (('table_names', ('Projects',)),)
+        cache.put("List records in Tasks", {'answer': 'tasks'}, [1.0, 0.0], tasks)
+        
+        assert cache.get("List records in Projects", [1.0, 0.01], projects) is None
+        assert cache.get("Show records in Tasks", [1.0, 0.01], tasks)['answer'] == 'tasks'
+    
+    def test_ttl_expiry(self):
+        """Test entries expire after the TTL"""
+        cache = SemanticQueryCache(max_size=4, ttl=0)
+        cache.put("List tables", {'answer': 'tables'})
+        
+        assert cache.get("List tables") is None
+        assert len(cache) == 0
+    
+    def test_lru_eviction(self):
+        """Test least recently used entries are evicted first"""
+        cache = SemanticQueryCache(max_size=2)
+        cache.put("a", {'answer': 'a'}, [1.0, 0.0])
+        cache.put("b", {'answer': 'b'}, [0.0, 1.0])
+        cache.get("a")
+        cache.put("c", {'answer': 'c'}, [1.0, 1.0])
+        
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get_stats()['evictions'] == 1
+    
+    def test_hits_are_independent_copies(self):
+        """Test editing a cached response, even nested values, leaves the cache unchanged"""
+        cache = SemanticQueryCache(max_size=4)
+        response = {'answer': 'tables', 'data': {'tables': ['Tasks']}}
+        cache.put("List tables", response)
+        response['data']['tables'].append('Projects')
+        
+        hit = cache.get("List tables")
+        hit['data']['tables'].clear()
+        
+        assert cache.get("List tables")['data'] == {'tables': ['Tasks']}
+    
+    def test_invalidate(self):
+        """Test invalidation clears all entries"""
+        cache = SemanticQueryCache(max_size=4)
+        cache.put("List tables", {'answer': 'tables'}, [1.0, 0.0])
+        cache.invalidate()
+        
+        assert len(cache) == 0
+        assert cache.get("List tables", [1.0, 0.0]) is None
+
+
+class TestJsonUtils:
+    """Test cases for JSON helpers"""
+    
+    def test_round_trip_with_datetime_and_enum(self):
+        """Test metrics-style payloads serialize without manual conversion"""
+        payload = {
+            'start_time': datetime(2024, 1, 1),
+            'intent': QueryIntent.DATA_QUERY,
+            'count': 3
+        }
+        
+        decoded = loads(dumps(payload, indent=True))
+        
+        assert decoded == {
+            'start_time': '2024-01-01T00:00:00+00:00',
+            'intent': 'data_query',
+            'count': 3
+        }
+
+
 class TestPerformance:
     """Performance and stress tests"""
     
@@ -454,20 +959,11 @@ class TestPerformance:
         """Test handling multiple concurrent queries"""
         agent = AirtableAIAgent()
         
-        # Mock components for performance testing
-        agent.context_manager = AsyncMock()
-        agent.mcp_client = AsyncMock()
-        agent.airtable_expert = AsyncMock()
+        # Stub components for performance testing
+        _stub_components(agent)
         
         # Setup fast mock responses
-        agent.airtable_expert.analyze_query.return_value = QueryAnalysis(
-            intent=QueryIntent.DATA_QUERY,
-            confidence=0.8,
-            entities={},
-            required_tools=[],
-            context_categories=['api'],
-            complexity='simple'
-        )
+        agent.airtable_expert.analyze_query.return_value = SIMPLE_ANALYSIS
         agent.airtable_expert.plan_operations.return_value = []
         agent.airtable_expert.generate_response.return_value = {
             'success': True,
@@ -477,56 +973,87 @@ class TestPerformance:
         
         # Test concurrent processing
         queries = [f"Query {i}" for i in range(10)]
-        start_time = datetime.now()
-        
-        responses = await agent.batch_process(queries)
         
-        end_time = datetime.now()
-        processing_time = (end_time - start_time).total_seconds()
+        # Stubbed dependencies make this pure scheduling; a hang fails fast
+        responses = await asyncio.wait_for(agent.batch_process(queries), timeout=1.0)
         
         # Assertions
         assert len(responses) == 10
-        assert processing_time < 5.0  # Should complete within 5 seconds
-        assert agent.metrics['requests_handled'] == 10
+        assert agent.metrics.requests_handled == 10
     
+    @pytest.mark.parametrize("max_concurrency", [1, 2, 4, 8, 16])
+    def test_batch_process_benchmark(self, aio_benchmark, max_concurrency):
+        """Benchmark batch processing with stubbed components across concurrency limits"""
+        agent = AirtableAIAgent()
+        _stub_components(agent)
+        agent.airtable_expert.analyze_query.return_value = SIMPLE_ANALYSIS
+        agent.airtable_expert.plan_operations.return_value = []
+        agent.airtable_expert.generate_response.return_value = {
+            'success': True,
+            'answer': 'Test response'
+        }
+        
+        queries = [f"Query {i}" for i in range(32)]
+        
+        async def run():
+            agent.query_cache.invalidate()  # Measure the full path, not cache hits
+            return await agent.batch_process(queries, max_concurrency=max_concurrency)
+        
+        responses = aio_benchmark(run)
+        
+        # Throughput per limit, so a shifted knee shows up in saved runs
+        benchmark = aio_benchmark.benchmark
+        benchmark.extra_info['max_concurrency'] = max_concurrency
+        if benchmark.stats:
+            benchmark.extra_info['queries_per_second'] = len(queries) / benchmark.stats.stats.mean
+        
+        assert len(responses) == 32
+    
+    @pytest.mark.serial  # Tracing slows every allocation, so keep it out of the parallel run
     @pytest.mark.asyncio
     async def test_memory_usage(self):
         """Test memory usage with large context"""
-        import psutil
-        import os
+        import tracemalloc
         
-        process = psutil.Process(os.getpid())
-        initial_memory = process.memory_info().rss
+        # Count only Python allocations made by this test
+        tracemalloc.start()
+        tracemalloc.reset_peak()
         
         # Create agent with large context
         agent = AirtableAIAgent()
         
         # Simulate processing with large context
-        large_chunks = []
-        for i in range(100):
-            chunk = DocumentChunk(
+        large_chunks = [
+            DocumentChunk(
                 id=f"chunk_{i}",
-                content="Large content " * 1000,  # 1000 words per chunk
+                content=LARGE_CONTENT,
                 title=f"Chunk {i}",
                 category="test",
                 tokens=1000
             )
-            large_chunks.append(chunk)
+            for i in range(100)
+        ]
         
-        # Mock context manager to return large chunks
-        agent.context_manager = AsyncMock()
+        # Stub context manager to return large chunks
+        _stub_components(agent)
+        agent.airtable_expert.analyze_query.return_value = SIMPLE_ANALYSIS
+        agent.airtable_expert.plan_operations.return_value = []
+        agent.airtable_expert.generate_response.return_value = {
+            'success': True,
+            'answer': 'Test response'
+        }
         agent.context_manager.get_relevant_context.return_value = large_chunks
-        agent.mcp_client = AsyncMock()
-        agent.airtable_expert = AsyncMock()
         
         # Process query
-        await agent.process_query("Test query")
-        
-        final_memory = process.memory_info().rss
-        memory_increase = (final_memory - initial_memory) / 1024 / 1024  # MB
+        try:
+            response = await agent.process_query("Test query")
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
         
-        # Memory increase should be reasonable
-        assert memory_increase < 500  # Less than 500MB increase
+        # Peak allocation should be reasonable
+        assert response['success']
+        assert peak < 50 * 1024 * 1024  # Less than 50MB
 
 
 if __name__ == "__main__":
@@ -4,11 +4,61 @@
 Final validation that everything is ready for GitHub deployment.
 """
 
+import io
 import os
+import re
+import sys
 import json
 import asyncio
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+try:
+    import yaml
+except ImportError:  # Reported by the YAML checks instead of failing at import
+    yaml = None
+
+# libyaml's C loader when PyYAML was built with it
+YAML_LOADER = getattr(yaml, "CSafeLoader", None) or getattr(yaml, "SafeLoader", None)
+
+# Sections README.md must contain, found in one scan
+README_SECTIONS = [
+    "# 🤖 Airtable AI Agent",
+    "## 🚀 Quick Start",
+    "## 💬 Usage Examples",
+    "## 🎯 Core Features",
+    "## 🔧 Configuration",
+    "## 🚀 Deployment",
+    "## 🧪 Testing"
+]
+README_SECTIONS_PATTERN = re.compile(
+    "|".join(re.escape(section) for section in sorted(README_SECTIONS, key=len, reverse=True))
+)
+
+# Set to any non-empty value to skip the agent functionality check (e.g. quick CI runs)
+SKIP_FUNCTIONAL_ENV = "SKIP_FUNCTIONAL_VALIDATION"
+
+# Placeholder text that should be replaced before deployment
+PLACEHOLDER_PATTERN = re.compile(r"your_token_here|example\.com", re.IGNORECASE)
+
+@lru_cache(maxsize=None)
+def _read_text(path: str) -> Optional[str]:
+    """Read a project file once; None if it doesn't exist"""
+    try:
+        return Path(path).read_text()
+    except FileNotFoundError:
+        return None
+
+@lru_cache(maxsize=None)
+def _load_yaml(path: str) -> Any:
+    """Parse a YAML file once (raises if missing or invalid)"""
+    if yaml is None:
+        raise ImportError("PyYAML is required to validate YAML files")
+    content = _read_text(path)
+    if content is None:
+        raise FileNotFoundError(path)
+    return yaml.load(content, Loader=YAML_LOADER)
 
 def validate_file_structure() -> List[Dict[str, Any]]:
     """Validate all required files exist"""
@@ -49,8 +99,18 @@ def validate_file_structure() -> List[Dict[str, Any]]:
         "__init__.py"
     ]
     
+    # List each directory once instead of checking every file separately
+    listings: Dict[str, set] = {}
+    for directory in {os.path.dirname(file_path) for file_path in required_files}:
+        try:
+            with os.scandir(directory or ".") as entries:
+                listings[directory] = {entry.name for entry in entries if entry.is_file()}
+        except FileNotFoundError:
+            listings[directory] = set()
+    
     for file_path in required_files:
-        if not Path(file_path).exists():
+        directory, name = os.path.split(file_path)
+        if name not in listings[directory]:
             issues.append({
                 'type': 'missing_file',
                 'severity': 'high',
@@ -64,8 +124,8 @@ def validate_readme() -> List[Dict[str, Any]]:
     issues = []
     
     try:
-        readme_path = Path("README.md")
-        if not readme_path.exists():
+        content = _read_text("README.md")
+        if content is None:
             issues.append({
                 'type': 'missing_readme',
                 'severity': 'high',
@@ -73,20 +133,9 @@ def validate_readme() -> List[Dict[str, Any]]:
             })
             return issues
         
-        content = readme_path.read_text()
-        
-        required_sections = [
-            "# 🤖 Airtable AI Agent",
-            "## 🚀 Quick Start",
-            "## 💬 Usage Examples",
-            "## 🎯 Core Features",
-            "## 🔧 Configuration",
-            "## 🚀 Deployment",
-            "## 🧪 Testing"
-        ]
-        
-        for section in required_sections:
-            if section not in content:
+        found = set(README_SECTIONS_PATTERN.findall(content))
+        for section in README_SECTIONS:
+            if section not in found:
                 issues.append({
                     'type': 'missing_readme_section',
                     'severity': 'medium',
@@ -94,7 +143,7 @@ def validate_readme() -> List[Dict[str, Any]]:
                 })
         
         # Check for placeholder content
-        if "your_token_here" in content.lower() or "example.com" in content.lower():
+        if PLACEHOLDER_PATTERN.search(content):
             issues.append({
                 'type': 'placeholder_content',
                 'severity': 'low',
@@ -115,10 +164,8 @@ def validate_docker_files() -> List[Dict[str, Any]]:
     issues = []
     
     # Check Dockerfile
-    dockerfile_path = Path("Dockerfile")
-    if dockerfile_path.exists():
-        content = dockerfile_path.read_text()
-        
+    content = _read_text("Dockerfile")
+    if content is not None:
         if "COPY requirements.txt" not in content:
             issues.append({
                 'type': 'docker_requirements',
@@ -134,12 +181,9 @@ def validate_docker_files() -> List[Dict[str, Any]]:
             })
     
     # Check docker-compose.yml
-    compose_path = Path("docker-compose.yml")
-    if compose_path.exists():
+    if _read_text("docker-compose.yml") is not None:
         try:
-            import yaml
-            with open(compose_path) as f:
-                compose_data = yaml.safe_load(f)
+            compose_data = _load_yaml("docker-compose.yml")
             
             if 'services' not in compose_data:
                 issues.append({
@@ -161,8 +205,8 @@ def validate_github_actions() -> List[Dict[str, Any]]:
     """Validate GitHub Actions workflow"""
     issues = []
     
-    workflow_path = Path(".github/workflows/ci-cd.yml")
-    if not workflow_path.exists():
+    workflow_path = ".github/workflows/ci-cd.yml"
+    if _read_text(workflow_path) is None:
         issues.append({
             'type': 'missing_workflow',
             'severity': 'high',
@@ -171,9 +215,7 @@ def validate_github_actions() -> List[Dict[str, Any]]:
         return issues
     
     try:
-        import yaml
-        with open(workflow_path) as f:
-            workflow_data = yaml.safe_load(f)
+        workflow_data = _load_yaml(workflow_path)
         
         # Check for required jobs
         jobs = workflow_data.get('jobs', {})
@@ -201,14 +243,15 @@ def validate_requirements() -> List[Dict[str, Any]]:
     issues = []
     
     for req_file in ["requirements.txt", "requirements-basic.txt"]:
-        if Path(req_file).exists():
+        content = _read_text(req_file)
+        if content is not None:
             try:
-                with open(req_file) as f:
-                    content = f.read()
-                
-                # Check for version pins
-                lines = [line.strip() for line in content.split('\n') if line.strip() and not line.startswith('#')]
-                unpinned = [line for line in lines if '>=' not in line and '==' not in line and '~=' not in line]
+                # Check for version pins in one pass over the non-comment lines
+                unpinned = [
+                    stripped for line in content.splitlines()
+                    if (stripped := line.strip()) and not stripped.startswith('#')
+                    and '>=' not in stripped and '==' not in stripped and '~=' not in stripped
+                ]
                 
                 if unpinned:
                     issues.append({
@@ -230,9 +273,11 @@ async def validate_functionality():
     """Run basic functionality tests"""
     issues = []
     
+    if os.environ.get(SKIP_FUNCTIONAL_ENV):
+        return issues
+    
     try:
         # Import test
-        import sys
         sys.path.insert(0, str(Path.cwd()))
         
         from src.agent_basic import AirtableAIAgentBasic
@@ -269,72 +314,82 @@ async def main():
     
     all_issues = []
     
-    # Run all validations
-    validations = [
-        ("File Structure", validate_file_structure()),
-        ("README Content", validate_readme()),
-        ("Docker Configuration", validate_docker_files()),
-        ("GitHub Actions", validate_github_actions()),
-        ("Requirements", validate_requirements()),
-        ("Basic Functionality", await validate_functionality())
+    # Run all validations concurrently; file checks overlap the functionality test
+    loop = asyncio.get_running_loop()
+    file_checks = [
+        ("File Structure", validate_file_structure),
+        ("README Content", validate_readme),
+        ("Docker Configuration", validate_docker_files),
+        ("GitHub Actions", validate_github_actions),
+        ("Requirements", validate_requirements)
     ]
+    results = await asyncio.gather(
+        *(loop.run_in_executor(None, check) for _, check in file_checks),
+        validate_functionality()
+    )
+    names = [name for name, _ in file_checks] + ["Basic Functionality"]
+    skipped = {"Basic Functionality"} if os.environ.get(SKIP_FUNCTIONAL_ENV) else set()
+    validations = list(zip(names, results))
     
+    # Build the report in memory and write it out in one go
+    report = io.StringIO()
     for name, issues in validations:
-        print(f"\n📋 {name}")
-        if not issues:
-            print("   ✅ All checks passed")
+        print(f"\n📋 {name}", file=report)
+        if name in skipped:
+            print(f"   ⏭️  Skipped ({SKIP_FUNCTIONAL_ENV} is set)", file=report)
+        elif not issues:
+            print("   ✅ All checks passed", file=report)
         else:
             for issue in issues:
                 severity = issue['severity'].upper()
                 icon = "🔴" if severity == "HIGH" else "🟡" if severity == "MEDIUM" else "🔵"
-                print(f"   {icon} [{severity}] {issue['message']}")
+                print(f"   {icon} [{severity}] {issue['message']}", file=report)
             all_issues.extend(issues)
     
     # Summary
-    print("\n" + "=" * 50)
-    print("📊 Validation Summary")
-    print("=" * 50)
+    print("\n" + "=" * 50, file=report)
+    print("📊 Validation Summary", file=report)
+    print("=" * 50, file=report)
     
     high_issues = [i for i in all_issues if i['severity'] == 'high']
     medium_issues = [i for i in all_issues if i['severity'] == 'medium']
     low_issues = [i for i in all_issues if i['severity'] == 'low']
     
-    print(f"🔴 High severity issues: {len(high_issues)}")
-    print(f"🟡 Medium severity issues: {len(medium_issues)}")
-    print(f"🔵 Low severity issues: {len(low_issues)}")
+    print(f"🔴 High severity issues: {len(high_issues)}", file=report)
+    print(f"🟡 Medium severity issues: {len(medium_issues)}", file=report)
+    print(f"🔵 Low severity issues: {len(low_issues)}", file=report)
     
     # Overall assessment
     if len(high_issues) == 0:
         if len(medium_issues) <= 2:
-            print("\n🎉 READY FOR GITHUB DEPLOYMENT!")
-            print("   The project meets all requirements for public release.")
+            print("\n🎉 READY FOR GITHUB DEPLOYMENT!", file=report)
+            print("   The project meets all requirements for public release.", file=report)
             deployment_ready = True
         else:
-            print("\n⚠️  MOSTLY READY - Address medium issues for best results")
+            print("\n⚠️  MOSTLY READY - Address medium issues for best results", file=report)
             deployment_ready = True
     else:
-        print("\n❌ NOT READY - Fix high severity issues first")
+        print("\n❌ NOT READY - Fix high severity issues first", file=report)
         deployment_ready = False
     
     # Provide next steps
-    print("\n📝 Next Steps:")
+    print("\n📝 Next Steps:", file=report)
     if deployment_ready:
-        print("   1. Address any remaining medium/low issues")
-        print("   2. Update placeholder content in README")
-        print("   3. Test Docker build if Docker daemon available")
-        print("   4. Create GitHub repository and push code")
-        print("   5. Verify GitHub Actions workflow runs successfully")
+        print("   1. Address any remaining medium/low issues", file=report)
+        print("   2. Update placeholder content in README", file=report)
+        print("   3. Test Docker build if Docker daemon available", file=report)
+        print("   4. Create GitHub repository and push code", file=report)
+        print("   5. Verify GitHub Actions workflow runs successfully", file=report)
     else:
-        print("   1. Fix all high severity issues")
-        print("   2. Re-run validation script")
-        print("   3. Address medium and low issues")
-        print("   4. Proceed with deployment")
+        print("   1. Fix all high severity issues", file=report)
+        print("   2. Re-run validation script", file=report)
+        print("   3. Address medium and low issues", file=report)
+        print("   4. Proceed with deployment", file=report)
     
+    sys.stdout.write(report.getvalue())
     return deployment_ready
 
 if __name__ == "__main__":
-    import sys
-    
     # Suppress some logging for cleaner output
     import logging
     logging.getLogger("asyncio").setLevel(logging.WARNING)